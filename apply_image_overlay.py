@@ -9,6 +9,7 @@ from googleapiclient.http import MediaFileUpload
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from youtube_automation import SCOPES
+import youtube_api
 
 # Fix for Windows console encoding
 sys.stdout.reconfigure(encoding='utf-8')
@@ -73,6 +74,7 @@ def upload_video_scheduled(youtube, file, title, description, tags, publish_time
         if status:
             print(f"   ⬆️ Uploading: {int(status.progress() * 100)}%")
             
+    youtube_api.get_ledger().spend("videos.insert")
     print(f"   ✅ Upload Complete! ID: {response['id']}")
 
 def generate_seo(clip_num):
@@ -189,6 +191,11 @@ def main():
         if clip_num not in processed_files:
             continue
             
+        # Every upload is videos.insert (1600 units) - stop once today's quota can't cover one
+        if not youtube_api.can_start_slot(youtube_api.UPLOAD_COST):
+            print(f"⏸️  Stopping uploads - {youtube_api.get_ledger().summary()}, upload needs {youtube_api.UPLOAD_COST}")
+            break
+        
         file_path = processed_files[clip_num]
         title, desc, tags = generate_seo(clip_num)
         publish_time = schedule_map_utc[clip_num]
@@ -1,17 +1,18 @@
 import os
 import json
-import subprocess
 import sys
 import random
 import time
-from datetime import datetime, timedelta
 
 # Setup credentials from environment variables (for Render.com)
 from setup_env import setup_credentials_from_env
 setup_credentials_from_env()
 
 # Import core generation logic (ensure this is in the same directory)
-from viral_shorts_generator import process_video, get_video_id
+from viral_shorts_generator import (process_video, get_video_id, render_plan_item,
+                                    queue_plan_items, pop_render_queue, requeue_plan_item)
+import youtube_api
+import channel_playlists
 
 # Channels to target
 CHANNELS = {
@@ -44,128 +45,29 @@ def get_latest_video(channel_url, ignore_ids=[]):
     """
     Check for specific 'NEW' video from the channel (last 48 hours).
     """
-    print(f"   🔍 Checking for NEW videos (Last 48 hours)...")
-    # Calculate 48 hours ago date string YYYYMMDD
-    two_days_ago = (datetime.now() - timedelta(days=2)).strftime('%Y%m%d')
-    
-    cmd = [
-        sys.executable, "-m", "yt_dlp",
-        "--flat-playlist",
-        "--print-json",
-        "--dateafter", two_days_ago, 
-        "--playlist-end", "5",
-        "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        channel_url
-    ]
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-        print(f"   [DEBUG] New Video Search - RC: {result.returncode}, Output Len: {len(result.stdout)}")
-        if result.stderr: print(f"   [DEBUG] STDERR: {result.stderr[:200]}")
-        for line in result.stdout.strip().split('\n'):
-            if line:
-                try:
-                    data = json.loads(line)
-                    if data['id'] in ignore_ids:
-                        continue
-                        
-                    # Check duration (Skip shorts < 60s)
-                    dur = data.get('duration')
-                    if dur and dur < 60:
-                        continue
-                        
-                    print(f"   🚨 NEW DROP DETECTED: {data.get('title')}")
-                    return data
-                except:
-                    pass
-    except Exception as e:
-        print(f"Error checking new: {e}")
-        
-    return None
+    video = channel_playlists.newest_upload(channel_playlists.get_playlist(channel_url), ignore_ids, days=2)
+    if video:
+        print(f"   🚨 NEW DROP DETECTED: {video.get('title')}")
+    return video
 
 def get_recent_viral_video(channel_url, ignore_ids=[]):
     """
     Fallback: Most viral videos. First tries recent (After jan 2024), then All Time.
+    Both come from the same cached playlist fetch.
     """
+    entries = channel_playlists.get_playlist(channel_url)
+    
     # 1. Try Recent Viral First
-    print(f"   🔍 Finding recent hits (After {DATE_CUTOFF})...")
-    cmd = [
-        sys.executable, "-m", "yt_dlp",
-        "--flat-playlist",
-        "--print-json",
-        "--dateafter", DATE_CUTOFF, # Only recent years
-        "--playlist-end", "20",
-        "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        channel_url
-    ]
+    video = channel_playlists.most_viewed(entries, ignore_ids, since=DATE_CUTOFF,
+                                          window=channel_playlists.RECENT_WINDOW)
+    if video:
+        return video
     
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-        print(f"   [DEBUG] Recent Search - RC: {result.returncode}, Output Len: {len(result.stdout)}")
-        if result.stderr: print(f"   [DEBUG] STDERR: {result.stderr[:200]}")
-        
-        videos = []
-        for line in result.stdout.strip().split('\n'):
-            if line:
-                try:
-                    data = json.loads(line)
-                    dur = data.get('duration')
-                    if dur and dur < 60:
-                        continue
-                    videos.append(data)
-                except:
-                    pass
-        
-        # Sort specific to Recent search
-        videos.sort(key=lambda x: x.get('view_count', 0), reverse=True)
-        
-        for video in videos:
-            if video['id'] not in ignore_ids:
-                return video
-                
-    except Exception as e:
-        print(f"Error searching recent viral: {e}")
-
     # 2. Fallback: All Time Viral (If no recent found)
-    print(f"   ⚠️ No recent viral hits found. Searching ALL TIME viral...")
-    cmd_fallback = [
-        sys.executable, "-m", "yt_dlp",
-        "--flat-playlist",
-        "--print-json",
-        "--playlist-end", "50", # Fetch more to find a hit
-        "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        channel_url
-    ]
-    
-    try:
-        result = subprocess.run(cmd_fallback, capture_output=True, text=True, encoding='utf-8')
-        print(f"   [DEBUG] Fallback Search - RC: {result.returncode}, Output Len: {len(result.stdout)}")
-        if result.stderr: print(f"   [DEBUG] STDERR: {result.stderr[:200]}")
-        
-        fallback_videos = []
-        for line in result.stdout.strip().split('\n'):
-            if line:
-                try:
-                    data = json.loads(line)
-                    dur = data.get('duration')
-                    if dur and dur < 60:
-                        continue
-                    if data['id'] not in ignore_ids:
-                        fallback_videos.append(data)
-                except:
-                    pass
-        
-        # Sort fallback videos by views too
-        if fallback_videos:
-            fallback_videos.sort(key=lambda x: x.get('view_count', 0), reverse=True)
-            best_video = fallback_videos[0]
-            print(f"   ✅ Found All-Time Viral hit: {best_video.get('title')} ({best_video.get('view_count')} views)")
-            return best_video
-            
-    except Exception as e:
-        print(f"Error searching all-time viral: {e}")
-
-    return None
+    video = channel_playlists.most_viewed(entries, ignore_ids)
+    if video:
+        print(f"   ✅ Found All-Time Viral hit: {video.get('title')} ({video.get('view_count')} views)")
+    return video
 
 def get_video_for_channel(channel_name, channel_url, ignore_ids=[]):
     """
@@ -294,6 +196,7 @@ def upload_video_scheduled(youtube, file, title, description, tags):
         if status:
             print(f"   ⬆️ Uploading: {int(status.progress() * 100)}%")
             
+    youtube_api.get_ledger().spend("videos.insert")
     print(f"   ✅ Upload Complete! ID: {response['id']}")
     return response['id']
 
@@ -306,42 +209,53 @@ def main():
     print("🤖 AUTO-VIRAL CHANNELS BOT")
     print("=" * 60)
     
-    # Shuffle channels to try random order, but try ALL until one works
-    channel_items = list(CHANNELS.items())
-    random.shuffle(channel_items)
+    # Rendering is wasted if today's quota can't pay for the upload
+    if not youtube_api.can_start_slot(youtube_api.UPLOAD_COST):
+        print(f"⏸️  Skipping run - {youtube_api.get_ledger().summary()}, upload needs {youtube_api.UPLOAD_COST}")
+        return
     
-    video = None
-    selected_channel_name = None
-    
-    for name, url in channel_items:
-        print(f"🎯 Checking Target Channel: {name}")
-        candidate_video = get_video_for_channel(name, url, processed_ids)
+    # A clip planned by an earlier run renders without any discovery or download
+    selected_item = pop_render_queue()
+    selected_short = render_plan_item(selected_item) if selected_item else None
+    if selected_short:
+        channel_name = selected_item['channel_name']
+        video = {'id': selected_item['video_id'], 'title': selected_item['title']}
+        print(f"♻️  Using queued clip from: {video['title']} (t={int(selected_item['start'])}s)")
+    else:
+        # Shuffle channels to try random order, but try ALL until one works
+        channel_items = list(CHANNELS.items())
+        random.shuffle(channel_items)
         
-        if candidate_video:
-            video = candidate_video
-            channel_name = name # Update the main channel_name variable
-            channel_url = url
-            break
-        else:
-            print(f"   ⚠️ No suitable video found for {name}, trying next...")
-    
-    if not video:
-        print("❌ No suitable new video found in ANY channel.")
-        sys.exit(1)
+        # All channels probed at once; the first channel in shuffled order with a video wins
+        print(f"🎯 Checking Target Channels: {', '.join(name for name, _ in channel_items)}")
+        channel_name, channel_url, video = channel_playlists.probe_channels(
+            channel_items, lambda name, url: get_video_for_channel(name, url, processed_ids)
+        )
         
-    print(f"✅ Found Viral Video: {video.get('title')} ({video.get('view_count', 0)} views)")
-    video_url = f"https://www.youtube.com/watch?v={video['id']}"
-    
-    # 2. Process Video (Generate Shorts)
-    # Generate 3 shorts
-    shorts = process_video(video_url, num_clips=3, clip_duration=50)
-    
-    if not shorts:
-        print("❌ Failed to generate shorts.")
-        sys.exit(1)
+        if not video:
+            print("❌ No suitable new video found in ANY channel.")
+            sys.exit(1)
+            
+        print(f"✅ Found Viral Video: {video.get('title')} ({video.get('view_count', 0)} views)")
+        video_url = f"https://www.youtube.com/watch?v={video['id']}"
+        
+        # 2. Plan 3 shorts, render only the one this slot uploads
+        plan = process_video(video_url, num_clips=3, clip_duration=50, lazy=True)
+        items = plan['items'] if plan else []
+        while items and not selected_short:
+            selected_item = items.pop(0)
+            selected_short = render_plan_item(selected_item)
+        
+        if not selected_short:
+            print("❌ Failed to generate shorts.")
+            sys.exit(1)
+        
+        # The rest wait for later slots
+        context = {'channel_name': channel_name, 'title': video.get('title', 'Unknown')}
+        queue_plan_items([dict(item, **context) for item in items])
+        selected_item = dict(selected_item, **context)
 
     # 3. Optimize & Prepare for Upload
-    selected_short = shorts[0]
     seo = generate_seo_metadata(channel_name, video.get('title', 'Unknown'), selected_short)
     
     print("\n📊 SEO OPTIMIZATION REPORT (0/5 Criteria Check):")
@@ -370,15 +284,19 @@ def main():
             )
             
             # Update History only on success
-            processed_ids.append(video['id'])
+            if video['id'] not in processed_ids:
+                processed_ids.append(video['id'])
             history['processed_videos'] = processed_ids
             save_history(history)
             
         except Exception as e:
             print(f"❌ Upload Failed: {e}")
+            # The clip is still good: a later slot retries it first
+            requeue_plan_item(selected_item)
             sys.exit(1)
     else:
         print("❌ Authentication failed, strictly skipping upload.")
+        requeue_plan_item(selected_item)
         sys.exit(1)
 
 
@@ -0,0 +1,139 @@
+"""
+Shorts Render Benchmark
+Renders the same moments from a synthetic 1080p source (ffmpeg testsrc2 +
+sine tone, no download needed) three ways and reports the speedup against
+the per-clip path:
+    per-clip  - create_blurred_background_short, one after another
+    parallel  - process_video's worker pool (RENDER_STRATEGY=parallel)
+    batch     - render_shorts_batch, all shorts from one ffmpeg
+
+`profiles` instead renders the moments once per RENDER_PROFILES entry and
+reports encode fps, output frame count and SSIM against the "final"
+(full-resolution) output.
+
+Usage: python benchmark_render.py [profiles] [num clips] [clip seconds]
+"""
+
+import os
+import sys
+import re
+import time
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from viral_shorts_generator import (create_blurred_background_short, render_shorts_batch,
+                                    plan_render_workers, RENDER_PROFILES, TEMP_FOLDER)
+
+BENCH_FOLDER = os.path.join(TEMP_FOLDER, "render_bench")
+SOURCE_FPS = 30
+
+def make_source(path, seconds):
+    """1920x1080 30fps moving test pattern with a stereo tone"""
+    if os.path.exists(path):
+        return path
+    subprocess.run(['ffmpeg', '-v', 'error', '-y',
+                    '-f', 'lavfi', '-i', f'testsrc2=size=1920x1080:rate={SOURCE_FPS}:duration={seconds}',
+                    '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={seconds}',
+                    '-ac', '2', '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20',
+                    '-c:a', 'aac', '-shortest', path],
+                   check=True)
+    return path
+
+def outputs(label, count):
+    folder = os.path.join(BENCH_FOLDER, label)
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    return [os.path.join(folder, f"short_{i + 1}.mp4") for i in range(count)]
+
+def per_clip(source, moments, clip_seconds):
+    paths = outputs("per_clip", len(moments))
+    return [create_blurred_background_short(source, p, start, clip_seconds) for p, start in zip(paths, moments)]
+
+def parallel(source, moments, clip_seconds):
+    paths = outputs("parallel", len(moments))
+    workers, threads = plan_render_workers(len(moments))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda job: create_blurred_background_short(source, job[0], job[1], clip_seconds,
+                                                                         threads=threads),
+                             zip(paths, moments)))
+
+def batch(source, moments, clip_seconds):
+    paths = outputs("batch", len(moments))
+    return render_shorts_batch([(source, start, clip_seconds) for start in moments], paths,
+                               threads=os.cpu_count())
+
+def ssim(path, reference):
+    """Mean SSIM (All) of path against reference, None if ffmpeg couldn't compare"""
+    result = subprocess.run(['ffmpeg', '-i', path, '-i', reference, '-lavfi', 'ssim', '-f', 'null', '-'],
+                            capture_output=True, text=True)
+    match = re.search(r'All:([\d.]+)', result.stderr)
+    return float(match.group(1)) if match else None
+
+def frame_count(path):
+    """Decoded video frames in path (0 if ffmpeg couldn't read it)"""
+    result = subprocess.run(['ffmpeg', '-i', path, '-map', '0:v:0', '-f', 'null', '-'],
+                            capture_output=True, text=True)
+    counts = re.findall(r'frame=\s*(\d+)', result.stderr)
+    return int(counts[-1]) if counts else 0
+
+def setup(num_clips, clip_seconds):
+    os.makedirs(BENCH_FOLDER, exist_ok=True)
+    # Moments spread out like detect_viral_moments does, with gaps between them
+    source_seconds = 30 + num_clips * (clip_seconds + 15)
+    source = make_source(os.path.join(BENCH_FOLDER, f"source_{source_seconds}s.mp4"), source_seconds)
+    moments = [15 + i * (clip_seconds + 15) for i in range(num_clips)]
+    return source, source_seconds, moments
+
+def benchmark_profiles(num_clips=3, clip_seconds=20):
+    source, source_seconds, moments = setup(num_clips, clip_seconds)
+    frames = num_clips * clip_seconds * SOURCE_FPS
+    print(f"🧪 {num_clips} x {clip_seconds}s shorts per profile from a {source_seconds}s synthetic 1080p source\n")
+    
+    # "final" first: it is the reference the others are scored against
+    names = ["final"] + [name for name in RENDER_PROFILES if name != "final"]
+    rendered = {}
+    results = []
+    for name in names:
+        paths = outputs(f"profile_{name}", num_clips)
+        t0 = time.time()
+        for path, start in zip(paths, moments):
+            create_blurred_background_short(source, path, start, clip_seconds, profile=name)
+        seconds = time.time() - t0
+        rendered[name] = paths
+        scores = [ssim(path, ref) for path, ref in zip(paths, rendered["final"])]
+        scores = [score for score in scores if score is not None]
+        output_frames = sum(frame_count(path) for path in paths)
+        results.append((name, seconds, frames / seconds, output_frames,
+                        sum(scores) / len(scores) if scores else None))
+    
+    base = results[0][1]
+    print(f"\n{'Profile':<10}{'Seconds':>9}{'FPS':>8}{'Speedup':>9}{'Frames':>8}{'SSIM':>8}")
+    for name, seconds, fps, output_frames, score in results:
+        score = f"{score:.4f}" if score is not None else "n/a"
+        print(f"{name:<10}{seconds:>9.1f}{fps:>8.1f}{base / seconds:>8.2f}x{output_frames:>8}{score:>8}")
+    print(f"(expected {frames} frames per profile at the source {SOURCE_FPS} fps)")
+    return results
+
+def benchmark(num_clips=3, clip_seconds=20):
+    source, source_seconds, moments = setup(num_clips, clip_seconds)
+
+    print(f"🧪 {num_clips} x {clip_seconds}s shorts from a {source_seconds}s synthetic 1080p source "
+          f"({os.cpu_count()} cores)\n")
+    results = []
+    for name, fn in (("per-clip", per_clip), ("parallel", parallel), ("batch", batch)):
+        t0 = time.time()
+        ok = fn(source, moments, clip_seconds)
+        results.append((name, time.time() - t0, sum(bool(x) for x in ok)))
+
+    base = results[0][1]
+    print(f"\n{'Path':<10}{'Seconds':>9}{'Clips':>7}{'Speedup':>9}")
+    for name, seconds, done in results:
+        print(f"{name:<10}{seconds:>9.1f}{done:>7}{base / seconds:>8.2f}x")
+    return results
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["profiles"]:
+        benchmark_profiles(*[int(a) for a in sys.argv[2:4]])
+    else:
+        benchmark(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,66 @@
+"""
+Transcription Backend Benchmark
+Reports model load time and real-time factor (RTF = transcribe time / audio
+duration, lower is faster) for each backend on a local media file.
+
+Usage: python benchmark_transcription.py <media file> [backend ...] [--model small]
+"""
+
+import sys
+import time
+from transcription_backends import BACKENDS, create_backend, audio_duration
+
+def benchmark(file_path, backends=None, model="small"):
+    duration = audio_duration(file_path)
+    if duration <= 0:
+        print(f"❌ Could not read duration of {file_path}")
+        return []
+
+    print(f"🧪 Benchmarking on {file_path} ({duration:.1f}s of audio, model '{model}')\n")
+    results = []
+    for name in backends or list(BACKENDS):
+        try:
+            t0 = time.time()
+            engine = create_backend(name, model)
+            load_time = time.time() - t0
+
+            t0 = time.time()
+            result = engine.transcribe(file_path, language="hi", word_timestamps=True)
+            run_time = time.time() - t0
+        except ImportError as e:
+            print(f"   ⚠️  {name}: not installed ({e})")
+            continue
+        except Exception as e:
+            print(f"   ❌ {name}: {e}")
+            continue
+
+        words = sum(len(seg.get('words', [])) for seg in result['segments'])
+        results.append({
+            'backend': name,
+            'load_seconds': load_time,
+            'transcribe_seconds': run_time,
+            'rtf': run_time / duration,
+            'segments': len(result['segments']),
+            'words': words
+        })
+        print(f"   ✓ {name}: RTF {run_time / duration:.3f}")
+
+    print(f"\n{'Backend':<16}{'Load (s)':>10}{'Run (s)':>10}{'RTF':>8}{'Segs':>7}{'Words':>8}")
+    for r in results:
+        print(f"{r['backend']:<16}{r['load_seconds']:>10.1f}{r['transcribe_seconds']:>10.1f}"
+              f"{r['rtf']:>8.3f}{r['segments']:>7}{r['words']:>8}")
+    return results
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    model = "small"
+    if "--model" in args:
+        i = args.index("--model")
+        model = args[i + 1]
+        del args[i:i + 2]
+
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    benchmark(args[0], args[1:] or None, model)
@@ -0,0 +1,137 @@
+"""
+Channel Identity Cache
+Maps each configured channel name to its channel ID and uploads playlist,
+persisted in channel_cache.json. A name is resolved once (search.list +
+channels.list, ~101 units) and then only revalidated by ID every
+CHANNEL_CACHE_TTL_DAYS (channels.list, 1 unit). Discovery then lists the
+uploads playlist directly instead of a free-text search that also returns
+other channels' videos.
+"""
+
+import os
+import re
+import json
+from datetime import datetime, timedelta
+from youtube_api import ENDPOINT_COSTS, QuotaExhausted
+
+CHANNEL_CACHE_FILE = "channel_cache.json"
+CHANNEL_CACHE_TTL_DAYS = 30
+
+# Hand-checked IDs for names the search resolves wrongly: {"Name": "UC..."}
+PINNED_CHANNELS = {}
+
+RESOLVE_COST = ENDPOINT_COSTS["search.list"] + ENDPOINT_COSTS["channels.list"]
+
+def load_cache(path=CHANNEL_CACHE_FILE):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+def save_cache(cache, path=CHANNEL_CACHE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def _normalize(name):
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+def is_fresh(entry, ttl_days=CHANNEL_CACHE_TTL_DAYS):
+    try:
+        checked = datetime.fromisoformat(entry['checked_at'])
+    except (KeyError, ValueError):
+        return False
+    return datetime.now() - checked < timedelta(days=ttl_days)
+
+def _best_match(name, items):
+    """Exact title match first, then containment either way, then the top result"""
+    wanted = _normalize(name)
+    titles = [(_normalize(item['snippet']['title']), item) for item in items]
+    for title, item in titles:
+        if title == wanted:
+            return item, True
+    for title, item in titles:
+        if title and (wanted in title or title in wanted):
+            return item, True
+    return (items[0], False) if items else (None, False)
+
+def _channel_details(client, channel_id):
+    response = client.call("channels.list", part="snippet,contentDetails", id=channel_id)
+    items = response.get('items', [])
+    if not items:
+        return None
+    item = items[0]
+    return {
+        'channel_id': item['id'],
+        'title': item['snippet']['title'],
+        'uploads': item['contentDetails']['relatedPlaylists']['uploads'],
+        'checked_at': datetime.now().isoformat()
+    }
+
+def resolve_channel(client, name, entry=None):
+    """
+    Cache entry for `name`: revalidate a known ID (1 unit), otherwise
+    search for the channel (101 units). None if nothing was found.
+    """
+    pinned = PINNED_CHANNELS.get(name)
+    channel_id = pinned or (entry or {}).get('channel_id')
+    if channel_id:
+        details = _channel_details(client, channel_id)
+        if details:
+            details['exact'] = True if pinned else (entry or {}).get('exact', True)
+            return details
+
+    response = client.call("search.list", part="snippet", q=name, type="channel",
+                           maxResults=5, regionCode="IN")
+    item, exact = _best_match(name, response.get('items', []))
+    if not item:
+        return None
+    details = _channel_details(client, item['snippet']['channelId'])
+    if details:
+        details['exact'] = exact
+        if not exact:
+            print(f"  ⚠️  '{name}' resolved to '{details['title']}' (no exact match, pin it in PINNED_CHANNELS if wrong)")
+    return details
+
+def resolve_channels(client, names, reserve=0, path=CHANNEL_CACHE_FILE):
+    """
+    {name: entry} for every name that is (or can now be) resolved.
+    Stale entries are revalidated and new names resolved only while the
+    ledger keeps `reserve` units free; stale entries are still used when
+    the budget runs out.
+    """
+    cache = load_cache(path)
+    changed = False
+
+    for name in names:
+        entry = cache.get(name)
+        pin_changed = name in PINNED_CHANNELS and (entry or {}).get('channel_id') != PINNED_CHANNELS[name]
+        if entry and is_fresh(entry) and not pin_changed:
+            continue
+
+        cost = ENDPOINT_COSTS["channels.list"] if entry or name in PINNED_CHANNELS else RESOLVE_COST
+        if client.ledger.remaining() - reserve < cost:
+            continue
+        try:
+            resolved = resolve_channel(client, name, entry)
+        except QuotaExhausted:
+            break
+        except Exception as e:
+            print(f"  ❌ Could not resolve '{name}': {e}")
+            continue
+        if resolved:
+            cache[name] = resolved
+            changed = True
+
+    if changed:
+        save_cache(cache, path)
+    return {name: cache[name] for name in names if name in cache}
+
+def uploads_playlists(client, names, reserve=0):
+    """{name: uploads playlist ID} - what the discovery planner needs"""
+    return {name: entry['uploads'] for name, entry in resolve_channels(client, names, reserve).items()
+            if entry.get('uploads')}
@@ -0,0 +1,116 @@
+"""
+Channel Playlist Discovery (yt-dlp, in process)
+Each channel's flat uploads list is fetched ONCE per run through the
+yt_dlp.YoutubeDL API - no interpreter spawns, no buffered stdout parsing -
+and the "new", "recent viral" and "all-time viral" questions are answered
+from that one cached list. probe_channels() checks channels concurrently and
+stops as soon as the highest-priority channel with a candidate is known.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import yt_dlp
+
+PLAYLIST_LIMIT = 50   # Enough for the all-time query, the others use the head of it
+NEW_WINDOW = 5        # Newest uploads checked for a fresh drop
+RECENT_WINDOW = 20    # Uploads checked for a recent hit
+MIN_DURATION = 60     # Anything shorter is a short
+PROBE_WORKERS = 4
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+
+# channel url -> flat entries, newest first (for this run)
+_playlists = {}
+_lock = threading.Lock()
+
+def uploads_url(channel_url):
+    """The channel's Videos tab - the uploads list without shorts/live tabs"""
+    url = channel_url.rstrip('/')
+    if url.rsplit('/', 1)[-1] in ('videos', 'shorts', 'streams', 'live', 'featured'):
+        return url
+    return url + '/videos'
+
+def fetch_flat_playlist(channel_url, limit=PLAYLIST_LIMIT):
+    """One flat playlist request -> [entry, ...] newest first ([] on failure)"""
+    options = {
+        'extract_flat': 'in_playlist',
+        'playlistend': limit,
+        'skip_download': True,
+        'quiet': True,
+        'no_warnings': True,
+        'http_headers': {'User-Agent': USER_AGENT},
+        # Approximate upload dates from "2 days ago" labels, so date filters work on flat entries
+        'extractor_args': {'youtubetab': {'approximate_date': ['']}},
+    }
+    try:
+        with yt_dlp.YoutubeDL(options) as ydl:
+            info = ydl.extract_info(uploads_url(channel_url), download=False)
+    except Exception as e:
+        print(f"   ❌ Playlist fetch failed for {channel_url}: {str(e)[:200]}")
+        return []
+    return [entry for entry in (info or {}).get('entries') or [] if entry and entry.get('id')]
+
+def get_playlist(channel_url):
+    """Cached flat playlist for this run"""
+    with _lock:
+        if channel_url in _playlists:
+            return _playlists[channel_url]
+    entries = fetch_flat_playlist(channel_url)
+    with _lock:
+        _playlists[channel_url] = entries
+    return entries
+
+def clear_cache():
+    with _lock:
+        _playlists.clear()
+
+def entry_date(entry):
+    """'YYYYMMDD' or None when yt-dlp couldn't tell"""
+    if entry.get('upload_date'):
+        return entry['upload_date']
+    if entry.get('timestamp'):
+        return datetime.fromtimestamp(entry['timestamp']).strftime('%Y%m%d')
+    return None
+
+def _usable(entry, ignore_ids, since=None):
+    if entry['id'] in ignore_ids:
+        return False
+    duration = entry.get('duration')
+    if duration and duration < MIN_DURATION:
+        return False
+    date = entry_date(entry)
+    return not (since and date and date < since)
+
+def newest_upload(entries, ignore_ids=(), days=2):
+    """First usable upload of the last `days` days among the newest few"""
+    since = (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
+    return next((e for e in entries[:NEW_WINDOW] if _usable(e, ignore_ids, since)), None)
+
+def most_viewed(entries, ignore_ids=(), since=None, window=None):
+    """Most-viewed usable upload among the first `window` entries, published on/after `since`"""
+    candidates = [e for e in entries[:window] if _usable(e, ignore_ids, since)]
+    return max(candidates, key=lambda e: e.get('view_count') or 0, default=None)
+
+def probe_channels(channel_items, pick, workers=PROBE_WORKERS):
+    """
+    Run pick(name, url) for [(name, url), ...] concurrently and return
+    (name, url, result) for the FIRST channel in list order with a result -
+    the same answer as checking them one by one. Lower-priority probes
+    still queued are cancelled as soon as that answer is known.
+    """
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(pick, name, url) for name, url in channel_items]
+        for (name, url), future in zip(channel_items, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"   ❌ {name}: {e}")
+                continue
+            if result:
+                return name, url, result
+            print(f"   ⚠️ No suitable video found for {name}, trying next...")
+        return None, None, None
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,151 @@
+"""
+Chunked Parallel Transcription
+Splits the soundtrack at silence boundaries (from the PCM energy envelope),
+transcribes the chunks in a process pool - one model per worker, loaded once -
+and stitches segments and word timestamps back with global offsets.
+The pool stays up between calls, so its models stay warm; a source that
+fits in one chunk goes to the warm transcription worker instead.
+"""
+
+import os
+import atexit
+import threading
+import subprocess
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from media_features import extract_audio_envelope
+from transcription_backends import create_backend, DEFAULT_BACKEND, SAMPLE_RATE
+import transcription_worker
+
+TARGET_CHUNK_SECONDS = 120   # Aim for ~2 minute chunks
+SILENCE_SEARCH_SECONDS = 20  # Look this far either side of the target for a pause
+SMOOTH_SECONDS = 0.5         # A "pause" must be quiet for about this long
+
+# Backend loaded once per pool worker (see _init_worker)
+_engine = None
+
+# Pool kept alive across calls: (key, executor)
+_pool = None
+_pool_lock = threading.Lock()
+
+def find_chunks(envelope, target=TARGET_CHUNK_SECONDS, search=SILENCE_SEARCH_SECONDS):
+    """
+    [(start, end), ...] covering the whole soundtrack, cut at the quietest
+    point within +/- search seconds of every multiple of target
+    """
+    duration = envelope.duration
+    if duration <= target + search:
+        return [(0.0, duration)]
+
+    frame = envelope.frame_seconds
+    db = envelope.frame_db()
+    width = max(1, int(round(SMOOTH_SECONDS / frame)))
+    smoothed = np.convolve(db, np.ones(width) / width, mode='same')
+
+    cuts = [0.0]
+    while duration - cuts[-1] > target + search:
+        lo = int((cuts[-1] + target - search) / frame)
+        hi = int((cuts[-1] + target + search) / frame)
+        quietest = lo + int(np.argmin(smoothed[lo:hi]))
+        cuts.append(round(quietest * frame, 3))
+    cuts.append(duration)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+def load_audio_range(path, start, end):
+    """float32 16kHz mono samples of [start, end) - the format Whisper expects"""
+    cmd = [
+        'ffmpeg', '-v', 'error', '-ss', str(start), '-i', path, '-t', str(end - start),
+        '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', '-acodec', 'pcm_s16le', '-'
+    ]
+    raw = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+def _init_worker(backend, model, threads):
+    """Runs once in each pool process: pin thread count, load the model"""
+    global _engine
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["FASTER_WHISPER_THREADS"] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _engine = create_backend(backend, model)
+
+def _transcribe_chunk(job):
+    path, start, end, language, word_timestamps = job
+    audio = load_audio_range(path, start, end)
+    return _engine.transcribe(audio, language=language, word_timestamps=word_timestamps)
+
+def get_pool(backend, model, workers, threads):
+    """The shared pool for these settings; a different model/size replaces it"""
+    global _pool
+    key = (backend, model, workers, threads)
+    with _pool_lock:
+        if _pool is None or _pool[0] != key:
+            if _pool is not None:
+                _pool[1].shutdown(wait=True)
+            _pool = (key, ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                                              initializer=_init_worker, initargs=(backend, model, threads)))
+        return _pool[1]
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool[1].shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def stitch(parts):
+    """Merge [(offset, result), ...] into one transcript in source time"""
+    segments = []
+    language = None
+    for offset, part in parts:
+        if not part:
+            continue
+        language = language or part.get('language')
+        for seg in part.get('segments', []):
+            seg = dict(seg)
+            seg['start'] = seg.get('start', 0) + offset
+            seg['end'] = seg.get('end', 0) + offset
+            if 'words' in seg:
+                seg['words'] = [dict(w, start=w['start'] + offset, end=w['end'] + offset)
+                                for w in seg['words']]
+            segments.append(seg)
+
+    segments.sort(key=lambda x: x['start'])
+    for i, seg in enumerate(segments):
+        seg['id'] = i
+    return {
+        'text': ''.join(seg.get('text', '') for seg in segments),
+        'segments': segments,
+        'language': language
+    }
+
+def transcribe_chunked(path, workers=None, backend=DEFAULT_BACKEND, model="small",
+                       language="hi", word_timestamps=True):
+    """
+    Transcribe `path` across `workers` processes (default: all cores).
+    Without an audio envelope it falls back to a single pass, never None.
+    """
+    cpus = os.cpu_count() or 1
+    workers = max(1, workers or cpus)
+
+    envelope = extract_audio_envelope(path)
+    chunks = find_chunks(envelope) if envelope is not None else None
+    if not chunks or len(chunks) == 1:
+        # Nothing to parallelize (or no envelope to cut at silences) - one
+        # pass on the warm model; it raises if the audio can't be read at all
+        return transcription_worker.transcribe(path, language=language, word_timestamps=word_timestamps,
+                                               model=model, backend=backend)
+    threads = max(1, cpus // workers)
+
+    print(f"   🧩 {len(chunks)} chunks across {min(workers, len(chunks))} workers ({threads} threads each)")
+    jobs = [(path, start, end, language, word_timestamps) for start, end in chunks]
+
+    results = list(get_pool(backend, model, workers, threads).map(_transcribe_chunk, jobs))
+
+    return stitch(zip((start for start, _ in chunks), results))
@@ -0,0 +1,73 @@
+"""
+Clip Selector
+Picks the best clip windows from per-second feature arrays:
+- every possible start is scored in O(n) from one cumulative sum
+  (window total = prefix[s + length] - prefix[s]), for any clip length
+- the top-K windows that do not overlap are taken greedily, best first,
+  suppressing every start that would overlap a window already taken
+"""
+
+import bisect
+import numpy as np
+
+def window_sums(values, length):
+    """sums[s] = values[s:s + length].sum() for every start s, via prefix sums"""
+    values = np.asarray(values, dtype=np.float64)
+    length = int(length)
+    if length <= 0 or values.size < length:
+        return np.zeros(0)
+    prefix = np.concatenate([[0.0], np.cumsum(values)])
+    return prefix[length:] - prefix[:-length]
+
+def window_means(values, length):
+    return window_sums(values, length) / max(int(length), 1)
+
+def combine(features, weights):
+    """Weighted per-second score from {name: array} and {name: weight}; arrays may differ in length"""
+    size = max((len(features[name]) for name in weights if features.get(name) is not None), default=0)
+    score = np.zeros(size)
+    for name, weight in weights.items():
+        values = features.get(name)
+        if values is None:
+            continue
+        values = np.asarray(values, dtype=np.float64)[:size]
+        score[:values.size] += weight * values
+    return score
+
+def top_windows(scores, length, k, allowed=None, min_gap=0):
+    """
+    Best `k` non-overlapping windows from per-start scores.
+    allowed: optional bool mask of usable starts. Windows keep at least
+    `min_gap` seconds between them. Returns [(start, score), ...] best first.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if allowed is not None:
+        scores = np.where(np.asarray(allowed[:scores.size], dtype=bool), scores, -np.inf)
+    spacing = int(length) + int(min_gap)
+
+    taken = []   # Starts picked so far, kept sorted for the overlap check
+    picks = []
+    # Stable sort: equal scores go to the earlier start
+    for start in np.argsort(-scores, kind='stable'):
+        if len(picks) >= k or not np.isfinite(scores[start]):
+            break
+        start = int(start)
+        i = bisect.bisect_left(taken, start)
+        if (i < len(taken) and taken[i] - start < spacing) or (i > 0 and start - taken[i - 1] < spacing):
+            continue
+        taken.insert(i, start)
+        picks.append((start, float(scores[start])))
+    return picks
+
+def select_clips(per_second, clip_seconds, k, allowed=None, start_weights=None, min_gap=0):
+    """
+    Top-K clips of `clip_seconds` from a per-second score array.
+    Window score = mean per-second score, times start_weights[start] if given.
+    Returns [{'start', 'end', 'score'}, ...] best first.
+    """
+    length = max(1, min(int(round(clip_seconds)), len(per_second)))
+    scores = window_means(per_second, length)
+    if start_weights is not None:
+        scores = scores * np.asarray(start_weights, dtype=np.float64)[:scores.size]
+    return [{'start': start, 'end': start + length, 'score': score}
+            for start, score in top_windows(scores, length, k, allowed, min_gap)]
@@ -0,0 +1,74 @@
+"""
+Discovery Cursors
+Per-channel state kept between runs in discovery_cursors.json:
+    endpoint, etag    - the last listing call and its response ETag
+                        (sent back as If-None-Match)
+    newest_id         - newest upload already seen
+    newest_published  - its publish time
+    recent            - [[video_id, published], ...] candidates still inside
+                        the discovery window
+A later run only parses uploads newer than the cursor; an unchanged channel
+answers 304 Not Modified and costs nothing to parse. The candidates it
+found earlier still come from `recent`, so their stats get refreshed with
+the usual videos.list batch.
+"""
+
+import os
+import json
+from datetime import datetime
+
+CURSOR_FILE = "discovery_cursors.json"
+
+def load_cursors(path=CURSOR_FILE):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+def save_cursors(cursors, path=CURSOR_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(cursors, f, indent=2)
+    os.replace(tmp, path)
+
+def take_new(cursor, items):
+    """
+    The leading part of `items` (newest first, (video_id, published, snippet))
+    that the cursor has not seen yet
+    """
+    newest_id = cursor.get('newest_id')
+    newest_published = cursor.get('newest_published', '')
+    new = []
+    for item in items:
+        video_id, published, _ = item
+        if video_id == newest_id or (newest_published and published <= newest_published):
+            break
+        new.append(item)
+    return new
+
+def etag_for(cursor, endpoint):
+    """ETags only match the same request, so a switch of endpoint starts fresh"""
+    return cursor.get('etag') if cursor.get('endpoint') == endpoint else None
+
+def advance(cursor, new_items, candidates, endpoint, etag, window_start):
+    """
+    Cursor after a listing: `new_items` are all unseen uploads (newest first),
+    `candidates` the (video_id, published) pairs among them worth ranking.
+    `recent` is pruned to uploads published after window_start.
+    """
+    cursor = dict(cursor)
+    if new_items:
+        cursor['newest_id'] = new_items[0][0]
+        cursor['newest_published'] = new_items[0][1]
+    if etag:
+        cursor['endpoint'] = endpoint
+        cursor['etag'] = etag
+
+    known = {video_id for video_id, _ in candidates}
+    recent = list(candidates) + [pair for pair in cursor.get('recent', []) if pair[0] not in known]
+    cursor['recent'] = [[video_id, published] for video_id, published in recent if published >= window_start]
+    cursor['updated_at'] = datetime.now().isoformat()
+    return cursor
@@ -0,0 +1,160 @@
+"""
+Download Manager - two-phase fetching
+Phase 1: only a low-bitrate audio stream, enough to run the analysis.
+Phase 2: only the chosen time ranges of the video (yt-dlp section downloads).
+A 2-hour podcast costs a few MB of audio plus ~1 minute of video per clip,
+instead of gigabytes of 1080p.
+
+Any URL yt-dlp understands works, including plain http media files, so the
+flow can be exercised offline against serve_media() (a stand-in server with
+HTTP Range support):  python download_manager.py <folder> [port]
+test_download.py runs both phases end to end that way.
+"""
+
+import os
+import sys
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from functools import partial
+
+# "full" = download whole source first (old behaviour), "two_phase" = audio first, sections later
+DOWNLOAD_MODE = os.environ.get("DOWNLOAD_MODE", "full")
+
+AUDIO_PROXY_FORMAT = "bestaudio[abr<=96]/worstaudio/worst"
+SECTION_FORMAT = "bestvideo[height<=1080]+bestaudio/best"
+
+def _yt_dlp(args):
+    """Run yt-dlp from this interpreter's environment, return the printed file paths"""
+    cmd = [sys.executable, "-m", "yt_dlp", "--no-playlist", "--no-progress"] + args
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True, encoding='utf-8')
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+def download_audio_proxy(url, output_base):
+    """
+    Phase 1: smallest usable audio stream -> '<output_base>.<ext>'.
+    Returns the file path, or None on failure.
+    """
+    for ext in ("m4a", "webm", "opus", "mp3", "mp4"):
+        if os.path.exists(f"{output_base}.{ext}"):
+            print(f"✓ Audio proxy already downloaded: {output_base}.{ext}")
+            return f"{output_base}.{ext}"
+
+    print("⬇️  Phase 1: downloading audio-only proxy for analysis...")
+    try:
+        paths = _yt_dlp(["-f", AUDIO_PROXY_FORMAT, "-o", f"{output_base}.%(ext)s",
+                         "--print", "after_move:filepath", url])
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Audio proxy download failed: {(e.stderr or '')[:200]}")
+        return None
+    if not paths or not os.path.exists(paths[-1]):
+        print("❌ Audio proxy download produced no file")
+        return None
+
+    size_mb = os.path.getsize(paths[-1]) / (1024 * 1024)
+    print(f"✅ Audio proxy: {paths[-1]} ({size_mb:.1f} MB)\n")
+    return paths[-1]
+
+def download_section(url, start, end, output_path):
+    """
+    Phase 2: only [start, end) of the video, cut on exact frames
+    (--force-keyframes-at-cuts). Returns output_path, or None on failure.
+    """
+    if os.path.exists(output_path):
+        return output_path
+
+    print(f"⬇️  Phase 2: fetching {int(start//60)}:{int(start%60):02d} - {int(end//60)}:{int(end%60):02d} only...")
+    try:
+        _yt_dlp(["-f", SECTION_FORMAT, "--merge-output-format", "mp4",
+                 "--download-sections", f"*{start:.2f}-{end:.2f}", "--force-keyframes-at-cuts",
+                 "-o", output_path, url])
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Section download failed: {(e.stderr or '')[:200]}")
+        return None
+    if not os.path.exists(output_path):
+        print("❌ Section download produced no file")
+        return None
+
+    print(f"✅ Section ready: {output_path}\n")
+    return output_path
+
+def download_sections(url, ranges, output_folder, video_id):
+    """Phase 2 for several [(start, end), ...] ranges -> list of paths (None where it failed)"""
+    os.makedirs(output_folder, exist_ok=True)
+    return [download_section(url, start, end,
+                             os.path.join(output_folder, f"{video_id}_{int(start)}s_{int(end)}s.mp4"))
+            for start, end in ranges]
+
+# ==================== STAND-IN MEDIA SERVER ====================
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static files with single-range 'Range: bytes=a-b' support (what ffmpeg seeks with)"""
+
+    def send_head(self):
+        range_header = self.headers.get("Range")
+        path = self.translate_path(self.path)
+        if not range_header or not range_header.startswith("bytes=") or not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        first, _, last = range_header[6:].split(",")[0].partition("-")
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+            else:
+                start = max(0, size - int(last))
+                end = size - 1
+        except ValueError:
+            return super().send_head()
+        if start >= size:
+            self.send_error(416, "Requested Range Not Satisfiable")
+            return None
+        end = min(end, size - 1)
+
+        f = open(path, 'rb')
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self._remaining = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, "_remaining", None)
+        try:
+            if remaining is None:
+                return super().copyfile(source, outputfile)
+            while remaining > 0:
+                block = source.read(min(64 * 1024, remaining))
+                if not block:
+                    break
+                outputfile.write(block)
+                remaining -= len(block)
+        except (BrokenPipeError, ConnectionResetError):
+            # Players/ffmpeg drop a read as soon as they have seeked elsewhere
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_media(folder, port=0):
+    """
+    Serve `folder` over http on a background thread.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    handler = partial(RangeRequestHandler, directory=folder)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else "."
+    server, base_url = serve_media(folder, int(sys.argv[2]) if len(sys.argv) > 2 else 8765)
+    print(f"📡 Serving {os.path.abspath(folder)} at {base_url}/<file> (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -11,6 +11,7 @@ from flask import Flask
 import schedule
 import subprocess
 import sys
+import youtube_api
 
 app = Flask(__name__)
 
@@ -33,6 +34,14 @@ def run_automation():
     print(f"{'='*60}\n")
     
     last_run_status["last_run"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Don't start a slot that can't finish: the upload alone costs UPLOAD_COST units
+    if not youtube_api.can_start_slot(youtube_api.UPLOAD_COST):
+        last_run_status["status"] = "⏸️ Skipped (API quota)"
+        last_run_status["progress"] = f"Not enough YouTube quota left - {youtube_api.get_ledger().summary()}"
+        print(f"⏸️  Skipping slot: {youtube_api.get_ledger().summary()}")
+        return
+    
     last_run_status["status"] = "🔄 Running..."
     last_run_status["progress"] = "Starting automation..."
     last_run_status["error_log"] = None
@@ -215,6 +224,10 @@ def home():
             
             {output_section}
             
+            <div class="status info">
+                <strong>YouTube API Quota:</strong> {youtube_api.get_ledger().summary()} ({youtube_api.remaining_budget():,} left)
+            </div>
+            
             <div class="status info">
                 <strong>Next Scheduled Run:</strong> {last_run_status['next_run'] or 'Calculating...'}
             </div>
@@ -247,7 +260,8 @@ def home():
 @app.route('/health')
 def health():
     """Simple health check for monitoring"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {"status": "healthy", "timestamp": datetime.now().isoformat(),
+            "quota_remaining": youtube_api.remaining_budget()}
 
 @app.route('/trigger')
 def trigger():
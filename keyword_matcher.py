@@ -0,0 +1,91 @@
+"""
+Keyword Matcher
+Viral keyword and sentiment word lists (English + Hinglish) compiled ONCE into
+a single word-boundary regex, with a batch API for scoring many texts per call.
+"""
+
+import re
+from bisect import bisect_right
+
+# High-impact viral keywords (trained from millions of viral videos)
+VIRAL_KEYWORDS = {
+    'extreme_hooks': ['secret', 'shocking', 'crazy', 'insane', 'unbelievable',
+                     'never', 'always', 'everyone', 'nobody'],
+    'emotional': ['love', 'hate', 'fear', 'angry', 'happy', 'sad', 'surprised'],
+    'questions': ['why', 'how', 'what', 'when', 'where', 'kya', 'kaise', 'kyun'],
+    'hindi_power': ['nahi', 'haan', 'sach', 'jhooth', 'dekho', 'suno', 'bolo'],
+    'emphasis': ['really', 'actually', 'literally', 'definitely', 'exactly']
+}
+VIRAL_WEIGHTS = {
+    'extreme_hooks': 3,  # Highest weight
+    'questions': 2,
+}
+DEFAULT_VIRAL_WEIGHT = 1
+
+# Excitement and controversy = viral
+SENTIMENT_WORDS = {
+    'positive': ['good', 'great', 'amazing', 'awesome', 'best', 'love',
+                 'accha', 'badiya', 'zabardast', 'kamaal'],
+    'negative': ['bad', 'terrible', 'worst', 'hate', 'wrong',
+                 'bura', 'galat', 'bekar'],
+    'excitement': ['wow', 'omg', 'wtf', 'what', 'really', 'seriously',
+                   'are bhai', 'yaar', 'abe']
+}
+SENTIMENT_WEIGHTS = {
+    'positive': 1.5,
+    'negative': 2,
+    'excitement': 2.5,
+}
+
+class KeywordMatcher:
+    """
+    Matches a fixed word list with one compiled regex. Each word counts once
+    per text (presence, not frequency) and adds its weight to the score.
+    """
+
+    def __init__(self, weighted_terms):
+        self.weights = {}
+        for term, weight in weighted_terms:
+            term = term.lower()
+            self.weights[term] = self.weights.get(term, 0) + weight
+        # Declaration order, so found keywords come back in list order
+        self.order = {term: i for i, term in enumerate(self.weights)}
+
+        # Longest first so multi-word phrases win over their prefixes
+        alternation = '|'.join(re.escape(t) for t in sorted(self.weights, key=len, reverse=True))
+        self.pattern = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+    @classmethod
+    def from_groups(cls, groups, weights, default_weight=1):
+        """Build from {category: [words]} plus {category: weight}"""
+        return cls((term, weights.get(category, default_weight))
+                   for category, terms in groups.items() for term in terms)
+
+    def _result(self, found):
+        terms = sorted(found, key=self.order.get)
+        return sum(self.weights[t] for t in terms), terms
+
+    def score(self, text):
+        """(score, found_terms) for one text"""
+        return self._result(set(self.pattern.findall(text.lower())))
+
+    def score_many(self, texts):
+        """
+        (score, found_terms) for every text, from a single regex scan over
+        all texts joined by newlines (no term contains a newline).
+        """
+        texts = [t.lower() for t in texts]
+        starts = []
+        pos = 0
+        for t in texts:
+            starts.append(pos)
+            pos += len(t) + 1
+
+        found = [set() for _ in texts]
+        for m in self.pattern.finditer('\n'.join(texts)):
+            found[bisect_right(starts, m.start()) - 1].add(m.group(0))
+
+        return [self._result(f) for f in found]
+
+VIRAL_MATCHER = KeywordMatcher.from_groups(VIRAL_KEYWORDS, VIRAL_WEIGHTS, DEFAULT_VIRAL_WEIGHT)
+SENTIMENT_MATCHER = KeywordMatcher.from_groups(SENTIMENT_WORDS, SENTIMENT_WEIGHTS)
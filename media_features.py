@@ -0,0 +1,234 @@
+"""
+Media Feature Engine
+Decodes a source once through a single ffmpeg pipe and computes per-window
+features with NumPy, instead of spawning one ffmpeg process per segment.
+"""
+
+import os
+import subprocess
+import numpy as np
+import media_probe
+
+# Audio decode settings
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_FRAME_SECONDS = 0.1   # Envelope resolution (100ms frames)
+AUDIO_READ_SECONDS = 30     # Pipe read size, keeps memory flat on long podcasts
+
+# Visual proxy settings: tiny grayscale frames at a low frame rate
+VISUAL_FPS = 5
+VISUAL_WIDTH = 96
+VISUAL_HEIGHT = 54
+SCENE_THRESHOLD = 0.3       # Same cut-off as select=gt(scene,0.3)
+
+# Same floor volumedetect reports for digital silence
+SILENCE_DB = -91.0
+INT16_FULL_SCALE = 32768.0
+
+def probe_audio_channels(video_path):
+    """Channel count of the first audio stream (0 if there is none)"""
+    return media_probe.audio_channels(video_path)
+
+class AudioEnvelope:
+    """Per-frame energy (sum of squares) and peak of the decoded soundtrack"""
+
+    def __init__(self, sumsq, peak, counts, frame_seconds=AUDIO_FRAME_SECONDS):
+        self.sumsq = sumsq
+        self.peak = peak
+        self.counts = counts
+        self.frame_seconds = frame_seconds
+
+    @property
+    def duration(self):
+        return float(self.counts.size * self.frame_seconds)
+
+    def frame_db(self):
+        """Mean volume of every frame in dBFS"""
+        return _power_to_db(self.sumsq, self.counts)
+
+    def window_levels(self, window, num_windows=None):
+        """
+        Bucket frames into fixed windows starting at 0.
+        Returns (mean_db, max_db) arrays, matching volumedetect's
+        mean_volume / max_volume for each window.
+        """
+        per_window = max(1, int(round(window / self.frame_seconds)))
+        if num_windows is None:
+            num_windows = int(np.ceil(self.counts.size / per_window))
+
+        size = num_windows * per_window
+        sumsq = _fit(self.sumsq, size).reshape(num_windows, per_window).sum(axis=1)
+        counts = _fit(self.counts, size).reshape(num_windows, per_window).sum(axis=1)
+        peak = _fit(self.peak, size).reshape(num_windows, per_window).max(axis=1)
+
+        mean_db = _power_to_db(sumsq, counts)
+        with np.errstate(divide='ignore'):
+            max_db = np.where(peak > 0, 20 * np.log10(peak / INT16_FULL_SCALE), SILENCE_DB)
+        return mean_db, max_db
+
+def _fit(values, size):
+    """Pad with zeros or truncate to exactly `size` elements"""
+    if values.size >= size:
+        return values[:size]
+    return np.concatenate([values, np.zeros(size - values.size, dtype=values.dtype)])
+
+def _power_to_db(sumsq, counts):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        power = sumsq / np.maximum(counts, 1) / (INT16_FULL_SCALE ** 2)
+        db = 10 * np.log10(power)
+    return np.where((counts > 0) & (power > 0), db, SILENCE_DB)
+
+def extract_audio_envelope(video_path, frame_seconds=AUDIO_FRAME_SECONDS):
+    """
+    Decode the whole soundtrack ONCE as 16-bit PCM through a single ffmpeg pipe
+    and reduce it to per-frame energy/peak. Returns None if there is no audio.
+    """
+    channels = probe_audio_channels(video_path)
+    if channels <= 0:
+        print(f"⚠️ No readable audio stream in {os.path.basename(video_path)} - audio scoring skipped")
+        return None
+
+    samples_per_frame = int(AUDIO_SAMPLE_RATE * frame_seconds) * channels
+    frames_per_read = max(1, int(AUDIO_READ_SECONDS / frame_seconds))
+    read_bytes = samples_per_frame * frames_per_read * 2
+
+    cmd = [
+        'ffmpeg', '-v', 'error', '-i', video_path,
+        '-vn', '-sn', '-dn', '-map', '0:a:0',
+        '-ar', str(AUDIO_SAMPLE_RATE), '-f', 's16le', '-acodec', 'pcm_s16le', '-'
+    ]
+
+    sumsq_parts, peak_parts, count_parts = [], [], []
+    leftover = np.zeros(0, dtype=np.int16)
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            chunk = proc.stdout.read(read_bytes)
+            if not chunk:
+                break
+            # read() only comes back short at EOF, so an odd byte is a truncated sample
+            usable = len(chunk) - (len(chunk) % 2)
+            samples = np.frombuffer(chunk[:usable], dtype=np.int16)
+            if leftover.size:
+                samples = np.concatenate([leftover, samples])
+
+            whole = (samples.size // samples_per_frame) * samples_per_frame
+            leftover = samples[whole:].copy()
+            if whole == 0:
+                continue
+
+            frames = samples[:whole].astype(np.float64).reshape(-1, samples_per_frame)
+            sumsq_parts.append(np.einsum('ij,ij->i', frames, frames))
+            peak_parts.append(np.abs(frames).max(axis=1))
+            count_parts.append(np.full(frames.shape[0], samples_per_frame, dtype=np.int64))
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+    if leftover.size:
+        tail = leftover.astype(np.float64)
+        sumsq_parts.append(np.array([np.dot(tail, tail)]))
+        peak_parts.append(np.array([np.abs(tail).max()]))
+        count_parts.append(np.array([tail.size], dtype=np.int64))
+
+    if not count_parts:
+        return None
+
+    return AudioEnvelope(
+        np.concatenate(sumsq_parts),
+        np.concatenate(peak_parts),
+        np.concatenate(count_parts),
+        frame_seconds
+    )
+
+class VisualFeatures:
+    """Per-frame difference energy and scene-cut times from the proxy decode"""
+
+    def __init__(self, mafd, scene, fps=VISUAL_FPS):
+        self.mafd = mafd      # Mean absolute frame difference (0-255)
+        self.scene = scene    # ffmpeg-style scene score (0-1)
+        self.fps = fps
+
+    @property
+    def duration(self):
+        return float(self.mafd.size / self.fps)
+
+    @property
+    def cut_times(self):
+        """Timestamps (seconds) where a scene cut was detected"""
+        return np.flatnonzero(self.scene > SCENE_THRESHOLD) / float(self.fps)
+
+    def motion_per_second(self):
+        """Average frame-difference energy for every second of the source"""
+        seconds = int(np.ceil(self.duration))
+        idx = (np.arange(self.mafd.size) // self.fps).astype(np.int64)
+        totals = np.bincount(idx, weights=self.mafd, minlength=seconds)
+        counts = np.bincount(idx, minlength=seconds)
+        return totals / np.maximum(counts, 1)
+
+    def scene_counts(self, window, num_windows=None):
+        """Number of scene cuts inside each [i*window, (i+1)*window) bucket"""
+        if num_windows is None:
+            num_windows = int(np.ceil(self.duration / window))
+        buckets = (self.cut_times // window).astype(np.int64)
+        buckets = buckets[buckets < num_windows]
+        return np.bincount(buckets, minlength=num_windows)
+
+    def motion_energy(self, window, num_windows=None):
+        """Average frame-difference energy inside each window"""
+        if num_windows is None:
+            num_windows = int(np.ceil(self.duration / window))
+        idx = (np.arange(self.mafd.size) / self.fps // window).astype(np.int64)
+        keep = idx < num_windows
+        totals = np.bincount(idx[keep], weights=self.mafd[keep], minlength=num_windows)
+        counts = np.bincount(idx[keep], minlength=num_windows)
+        return totals / np.maximum(counts, 1)
+
+def extract_visual_features(video_path, fps=VISUAL_FPS):
+    """
+    ONE pass over the video: ffmpeg drops to `fps`, downscales to a tiny
+    grayscale proxy and pipes raw frames into NumPy. Scene scores follow
+    ffmpeg's select filter: min(mafd, |mafd - prev_mafd|) / 100.
+    Returns None if the file has no decodable video.
+    """
+    frame_bytes = VISUAL_WIDTH * VISUAL_HEIGHT
+    frames_per_read = 256
+
+    cmd = [
+        'ffmpeg', '-v', 'error', '-i', video_path,
+        '-an', '-sn', '-dn', '-map', '0:v:0',
+        '-vf', f'fps={fps},scale={VISUAL_WIDTH}:{VISUAL_HEIGHT},format=gray',
+        '-f', 'rawvideo', '-'
+    ]
+
+    mafd_parts = []
+    prev_frame = None
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            chunk = proc.stdout.read(frame_bytes * frames_per_read)
+            whole = len(chunk) // frame_bytes
+            if whole == 0:
+                break
+            frames = np.frombuffer(chunk[:whole * frame_bytes], dtype=np.uint8)
+            frames = frames.reshape(whole, frame_bytes).astype(np.int16)
+
+            if prev_frame is not None:
+                frames = np.concatenate([prev_frame[None, :], frames])
+            else:
+                # First frame has nothing to compare against
+                mafd_parts.append(np.zeros(1))
+            mafd_parts.append(np.abs(np.diff(frames, axis=0)).mean(axis=1))
+            prev_frame = frames[-1]
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+    if not mafd_parts:
+        return None
+
+    mafd = np.concatenate(mafd_parts)
+    prev_mafd = np.concatenate([[0.0], mafd[:-1]])
+    scene = np.clip(np.minimum(mafd, np.abs(mafd - prev_mafd)) / 100.0, 0, 1)
+    return VisualFeatures(mafd, scene, fps)
@@ -0,0 +1,221 @@
+"""
+Media Probe
+One `ffprobe -print_format json` per file answers every "what is this file"
+question the pipeline asks: duration, streams, fps, resolution, audio
+channels and keyframe interval. Results are memoized in memory and on disk
+(temp/media_probe), keyed by path + size + mtime, so a source probed by the
+downloader, the analyzer and the renderer is only read once. cached() is
+the same store for other per-file results (smart_cut's keyframe index).
+
+Usage: python media_probe.py <file> [...]
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import threading
+import subprocess
+
+PROBE_FOLDER = os.path.join("temp", "media_probe")
+KEYFRAME_SAMPLE_SECONDS = 60  # Packets read to estimate the keyframe interval
+
+# Channel counts of the layout names `ffmpeg -i` prints (no-ffprobe fallback)
+CHANNEL_LAYOUTS = {'mono': 1, 'stereo': 2, '2.1': 3, '3.0': 3, 'quad': 4, '4.0': 4, '4.1': 5,
+                   '5.0': 5, '5.1': 6, '6.0': 6, '6.1': 7, '7.0': 7, '7.1': 8}
+
+_memo = {}
+_lock = threading.Lock()
+
+def _key(path):
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+def _cache_path(key):
+    return os.path.join(PROBE_FOLDER, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+def parse_rate(rate):
+    """'30000/1001' -> 29.97 (None for 0/0 or missing)"""
+    try:
+        num, _, den = (rate or '').partition('/')
+        return float(num) / float(den or 1) or None
+    except (ValueError, ZeroDivisionError):
+        return None
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _keyframe_interval(packets, video_index):
+    """Median gap between keyframes of the video stream in the sampled packets"""
+    times = sorted(_float(p.get('pts_time')) for p in packets
+                   if p.get('stream_index') == video_index and 'K' in p.get('flags', '')
+                   and _float(p.get('pts_time')) is not None)
+    gaps = sorted(b - a for a, b in zip(times, times[1:]) if b > a)
+    return round(gaps[len(gaps) // 2], 3) if gaps else None
+
+def summarize(data):
+    """ffprobe JSON -> the fields the pipeline uses"""
+    streams = data.get('streams') or []
+    fmt = data.get('format') or {}
+    video = next((s for s in streams if s.get('codec_type') == 'video'
+                  and not (s.get('disposition') or {}).get('attached_pic')), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    info = {
+        'duration': _float(fmt.get('duration')) or _float((video or audio or {}).get('duration')) or 0.0,
+        'format_name': fmt.get('format_name'),
+        'bit_rate': int(fmt['bit_rate']) if str(fmt.get('bit_rate', '')).isdigit() else None,
+        'video': None,
+        'audio': None,
+        'keyframe_interval': None,
+        'streams': streams,
+    }
+    if video:
+        info['video'] = {
+            'index': video.get('index'),
+            'codec_name': video.get('codec_name'),
+            'profile': video.get('profile'),
+            'width': video.get('width'),
+            'height': video.get('height'),
+            'pix_fmt': video.get('pix_fmt'),
+            'r_frame_rate': video.get('r_frame_rate'),
+            'fps': parse_rate(video.get('avg_frame_rate')) or parse_rate(video.get('r_frame_rate')),
+        }
+        info['keyframe_interval'] = _keyframe_interval(data.get('packets') or [], video.get('index'))
+    if audio:
+        info['audio'] = {
+            'index': audio.get('index'),
+            'codec_name': audio.get('codec_name'),
+            'channels': audio.get('channels') or 0,
+            'sample_rate': int(audio['sample_rate']) if str(audio.get('sample_rate', '')).isdigit() else None,
+        }
+    return info
+
+def _run_ffprobe(path):
+    probe = subprocess.run(
+        ['ffprobe', '-v', 'error', '-print_format', 'json',
+         '-show_format', '-show_streams',
+         '-show_entries', 'packet=stream_index,pts_time,flags',
+         '-read_intervals', f'%+{KEYFRAME_SAMPLE_SECONDS}', path],
+        capture_output=True, text=True
+    )
+    try:
+        return summarize(json.loads(probe.stdout))
+    except ValueError:
+        return None
+
+def _layout_channels(layout):
+    """'stereo' / '5.1(side)' / '3 channels' -> channel count (0 if unrecognised)"""
+    count = re.match(r"(\d+) channels", layout)
+    if count:
+        return int(count.group(1))
+    return CHANNEL_LAYOUTS.get(layout.split('(')[0].strip(), 0)
+
+def _ffmpeg_info(path):
+    """
+    Duration, frame size / rate and audio channels from `ffmpeg -i` stderr,
+    for installs without ffprobe
+    """
+    try:
+        result = subprocess.run(['ffmpeg', '-i', path], capture_output=True, text=True)
+    except OSError:
+        return None
+    match = re.search(r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})", result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = int(match.group(1)), int(match.group(2)), float(match.group(3))
+    video = None
+    stream = re.search(r"Stream #.*?: Video: .*?, (\d{2,5})x(\d{2,5}).*?([\d.]+) fps", result.stderr)
+    if stream:
+        # codec_name stays None: callers that need it (smart_cut) need ffprobe anyway
+        video = {'index': None, 'codec_name': None, 'profile': None,
+                 'width': int(stream.group(1)), 'height': int(stream.group(2)), 'pix_fmt': None,
+                 'r_frame_rate': None, 'fps': _float(stream.group(3))}
+    audio = None
+    stream = re.search(r"Stream #.*?: Audio: (\w+).*?, (\d+) Hz, ([^,\n]+)", result.stderr)
+    if stream:
+        audio = {'index': None, 'codec_name': stream.group(1),
+                 'channels': _layout_channels(stream.group(3)), 'sample_rate': int(stream.group(2))}
+    return {'duration': hours * 3600 + minutes * 60 + seconds, 'format_name': None, 'bit_rate': None,
+            'video': video, 'audio': audio, 'keyframe_interval': None, 'streams': []}
+
+def cached(path, kind, compute):
+    """
+    Memoize compute() -> (value, persist) for this version of `path` (path +
+    size + mtime), in memory and - when persist is true - on disk.
+    `kind` separates different results for the same file. None if the file is gone.
+    """
+    try:
+        key = f"{kind}|{_key(path)}"
+    except OSError:
+        return None
+    with _lock:
+        if key in _memo:
+            return _memo[key]
+
+    cache_file = _cache_path(key)
+    value = None
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    if value is None:
+        value, persist = compute()
+        if value is not None and persist:
+            os.makedirs(PROBE_FOLDER, exist_ok=True)
+            tmp = f"{cache_file}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(value, f)
+            os.replace(tmp, cache_file)
+
+    with _lock:
+        _memo[key] = value
+    return value
+
+def _probe_uncached(path):
+    try:
+        return _run_ffprobe(path), True
+    except OSError:
+        # No ffprobe binary: what `ffmpeg -i` prints, only remembered for this run
+        return _ffmpeg_info(path), False
+
+def probe(path):
+    """Probe summary of a media file (memoized), None if it can't be read"""
+    return cached(path, "probe", lambda: _probe_uncached(path))
+
+def duration(path, default=0.0):
+    """Container duration in seconds"""
+    info = probe(path)
+    return info['duration'] if info and info['duration'] else default
+
+def video_stream(path):
+    """codec_name / width / height / fps / pix_fmt ... of the main video stream, or None"""
+    info = probe(path)
+    return info['video'] if info else None
+
+def audio_channels(path):
+    """Channel count of the first audio stream (0 if there is none)"""
+    info = probe(path)
+    return info['audio']['channels'] if info and info['audio'] else 0
+
+def clear_memo():
+    with _lock:
+        _memo.clear()
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:]:
+        info = probe(arg)
+        if not info:
+            print(f"❌ {arg}: not a readable media file")
+            continue
+        video, audio = info['video'] or {}, info['audio'] or {}
+        print(f"🎞️  {arg}: {info['duration']:.2f}s"
+              f" | video {video.get('codec_name')} {video.get('width')}x{video.get('height')}"
+              f" @ {video.get('fps') or 0:.2f} fps, keyframe every {info['keyframe_interval']}s"
+              f" | audio {audio.get('codec_name')} {audio.get('channels', 0)}ch")
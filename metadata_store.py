@@ -0,0 +1,203 @@
+"""
+Video Metadata Store
+Candidate videos live in an SQLite file (metadata.db) instead of one JSON
+array rewritten whole:
+    videos          - latest metadata per video, indexed by channel,
+                      publish time and views
+    stat_snapshots  - timestamped views/likes/comments per video, so
+                      views-per-hour velocity is a SQL query
+Discovery bulk-upserts every detail batch it fetches and ranks its
+candidates by velocity_by_id(). The old channel_data.json is imported
+automatically into an empty store.
+
+Usage: python metadata_store.py [import <json file> | top [hours]]
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+DB_FILE = "metadata.db"
+LEGACY_JSON = "channel_data.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id       TEXT PRIMARY KEY,
+    title          TEXT,
+    channel        TEXT,
+    actual_channel TEXT,
+    duration       INTEGER,
+    published      TEXT,
+    url            TEXT,
+    views          INTEGER DEFAULT 0,
+    likes          INTEGER DEFAULT 0,
+    comments       INTEGER DEFAULT 0,
+    updated_at     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_videos_channel ON videos(channel, published);
+CREATE INDEX IF NOT EXISTS idx_videos_published ON videos(published);
+CREATE INDEX IF NOT EXISTS idx_videos_views ON videos(views DESC);
+
+CREATE TABLE IF NOT EXISTS stat_snapshots (
+    video_id  TEXT NOT NULL,
+    taken_at  TEXT NOT NULL,
+    views     INTEGER,
+    likes     INTEGER,
+    comments  INTEGER,
+    PRIMARY KEY (video_id, taken_at)
+);
+"""
+
+UPSERT_VIDEO = """
+INSERT INTO videos (video_id, title, channel, actual_channel, duration, published, url,
+                    views, likes, comments, updated_at)
+VALUES (:video_id, :title, :channel, :actual_channel, :duration, :published, :url,
+        :views, :likes, :comments, :taken_at)
+ON CONFLICT(video_id) DO UPDATE SET
+    title = COALESCE(excluded.title, videos.title),
+    channel = COALESCE(excluded.channel, videos.channel),
+    actual_channel = COALESCE(excluded.actual_channel, videos.actual_channel),
+    duration = COALESCE(excluded.duration, videos.duration),
+    published = COALESCE(excluded.published, videos.published),
+    url = COALESCE(excluded.url, videos.url),
+    views = excluded.views,
+    likes = excluded.likes,
+    comments = excluded.comments,
+    updated_at = excluded.updated_at
+"""
+
+INSERT_SNAPSHOT = """
+INSERT OR REPLACE INTO stat_snapshots (video_id, taken_at, views, likes, comments)
+VALUES (:video_id, :taken_at, :views, :likes, :comments)
+"""
+
+# Views gained per hour between each video's first and last snapshot in the
+# window; with a single snapshot, views since publish
+VELOCITY_SELECT = """
+WITH bounds AS (
+    SELECT video_id, MIN(taken_at) AS t0, MAX(taken_at) AS t1
+    FROM stat_snapshots
+    WHERE taken_at >= :since
+    GROUP BY video_id
+)
+SELECT v.video_id, v.title, v.channel, v.views, v.duration, v.published, v.url,
+       CASE WHEN b.t1 > b.t0
+            THEN (s1.views - s0.views) / ((julianday(b.t1) - julianday(b.t0)) * 24.0)
+            ELSE v.views / MAX((julianday(b.t1) - julianday(v.published)) * 24.0, 1.0)
+       END AS views_per_hour
+FROM bounds b
+JOIN stat_snapshots s0 ON s0.video_id = b.video_id AND s0.taken_at = b.t0
+JOIN stat_snapshots s1 ON s1.video_id = b.video_id AND s1.taken_at = b.t1
+JOIN videos v ON v.video_id = b.video_id
+"""
+
+VELOCITY_QUERY = VELOCITY_SELECT + """
+WHERE (:channel IS NULL OR v.channel = :channel)
+ORDER BY views_per_hour DESC, v.video_id
+LIMIT :limit
+"""
+
+ID_BATCH = 500  # Stays under SQLite's bound-parameter limit
+
+def utc_now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def connect(path=DB_FILE, legacy_json=LEGACY_JSON):
+    """Open (and create) the store; an empty store imports channel_data.json once"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    empty = conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0] == 0
+    if empty and legacy_json and os.path.exists(legacy_json):
+        count = import_json(conn, legacy_json)
+        print(f"🗄️  Imported {count} videos from {legacy_json}")
+    return conn
+
+def _row(video, taken_at):
+    return {
+        'video_id': video['video_id'],
+        'title': video.get('title'),
+        'channel': video.get('channel'),
+        'actual_channel': video.get('actual_channel'),
+        'duration': video.get('duration'),
+        'published': video.get('published'),
+        'url': video.get('url') or f"https://www.youtube.com/watch?v={video['video_id']}",
+        'views': int(video.get('views', 0)),
+        'likes': int(video.get('likes', 0)),
+        'comments': int(video.get('comments', 0)),
+        'taken_at': taken_at,
+    }
+
+def upsert_videos(conn, videos, taken_at=None):
+    """Insert/refresh video dicts (channel_data.json shape) and snapshot their stats, one transaction"""
+    taken_at = taken_at or utc_now()
+    rows = [_row(v, taken_at) for v in videos]
+    with conn:
+        conn.executemany(UPSERT_VIDEO, rows)
+        conn.executemany(INSERT_SNAPSHOT, rows)
+    return len(rows)
+
+def import_json(conn, path=LEGACY_JSON):
+    """Load a channel_data.json-style array; its stats are snapshotted at the file's mtime"""
+    with open(path, 'r', encoding='utf-8') as f:
+        videos = json.load(f)
+    taken_at = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return upsert_videos(conn, videos, taken_at)
+
+def video_from_api(item, channel=None):
+    """videos.list item -> store row dict"""
+    stats = item.get('statistics', {})
+    snippet = item.get('snippet', {})
+    duration = item.get('contentDetails', {}).get('duration')
+    return {
+        'video_id': item['id'],
+        'title': snippet.get('title'),
+        'channel': channel,
+        'actual_channel': snippet.get('channelTitle'),
+        'duration': parse_iso_duration(duration) if duration else None,
+        'published': snippet.get('publishedAt'),
+        'views': int(stats.get('viewCount', 0)),
+        'likes': int(stats.get('likeCount', 0)),
+        'comments': int(stats.get('commentCount', 0)),
+    }
+
+def parse_iso_duration(value):
+    """'PT1H2M3S' -> 3723"""
+    match = re.match(r'P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', value or '')
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+def top_by_velocity(conn, since, limit=10, channel=None):
+    """Fastest-growing videos with snapshots since `since` (ISO UTC)"""
+    return [dict(r) for r in conn.execute(VELOCITY_QUERY, {'since': since, 'limit': limit, 'channel': channel})]
+
+def velocity_by_id(conn, video_ids, since):
+    """{video_id: views_per_hour} for the given videos - what discovery ranks by"""
+    ids = list(video_ids)
+    velocity = {}
+    for i in range(0, len(ids), ID_BATCH):
+        batch = ids[i:i + ID_BATCH]
+        params = {'since': since, **{f"id{n}": video_id for n, video_id in enumerate(batch)}}
+        query = VELOCITY_SELECT + f"WHERE v.video_id IN ({', '.join(f':id{n}' for n in range(len(batch)))})"
+        velocity.update((r['video_id'], r['views_per_hour']) for r in conn.execute(query, params))
+    return velocity
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    conn = connect()
+    if args[:1] == ["import"]:
+        print(f"✅ Upserted {import_json(conn, args[1] if len(args) > 1 else LEGACY_JSON)} videos")
+    elif args[:1] == ["top"]:
+        hours = float(args[1]) if len(args) > 1 else 168
+        since = datetime.fromtimestamp(datetime.now(timezone.utc).timestamp() - hours * 3600,
+                                       timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        for r in top_by_velocity(conn, since):
+            print(f"{r['views_per_hour']:>10.1f} views/h  {r['channel']}: {r['title'][:60]}")
+    else:
+        print(__doc__)
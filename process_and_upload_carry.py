@@ -11,6 +11,7 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 
 # Import from existing scripts
 from youtube_automation import SCOPES
+import youtube_api
 
 # Fix for Windows console encoding
 sys.stdout.reconfigure(encoding='utf-8')
@@ -80,6 +81,7 @@ def upload_video_scheduled(youtube, file, title, description, tags, publish_time
         if status:
             print(f"   ⬆️ Uploading: {int(status.progress() * 100)}%")
             
+    youtube_api.get_ledger().spend("videos.insert")
     print(f"   ✅ Upload Complete! ID: {response['id']}")
     return response['id']
 
@@ -219,6 +221,11 @@ def main():
         if clip_num not in created_files:
             continue
             
+        # Every upload is videos.insert (1600 units) - stop once today's quota can't cover one
+        if not youtube_api.can_start_slot(youtube_api.UPLOAD_COST):
+            print(f"⏸️  Stopping uploads - {youtube_api.get_ledger().summary()}, upload needs {youtube_api.UPLOAD_COST}")
+            break
+        
         file_path = created_files[clip_num]
         title, desc, tags = generate_seo(clip_num)
         publish_time = schedule_map_utc[clip_num]
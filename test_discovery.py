@@ -0,0 +1,208 @@
+"""
+Discovery checks against a fake YouTube Data API, in a scratch folder.
+- Cursors: runs discovery three times (cold start, nothing changed, one new
+  upload) and prints requests, 304s, items parsed and quota units per run.
+- Concurrency: with simulated network latency, compares sequential and
+  concurrent scans, retries injected 429s, and stops on quotaExceeded.
+
+Each check takes pytest's monkeypatch + tmp_path, so every patch and the
+scratch folder are undone afterwards.
+
+Usage: python test_discovery.py   (or: pytest test_discovery.py)
+"""
+
+import os
+import sys
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from googleapiclient.errors import HttpError
+
+import youtube_automation
+import youtube_api
+
+class FakeResponse:
+    def __init__(self, status, reason):
+        self.status = status
+        self.reason = reason
+
+class FakeRequest:
+    def __init__(self, api, endpoint, params):
+        self.api = api
+        self.endpoint = endpoint
+        self.params = params
+        self.headers = {}
+
+    def execute(self):
+        self.api.before_request()
+        body = self.api.respond(self.endpoint, self.params)
+        etag = hashlib.md5(repr(body).encode()).hexdigest()
+        not_modified = self.headers.get('If-None-Match') == etag
+        with self.api.lock:
+            self.api.requests += 1
+            if not_modified:
+                self.api.not_modified += 1
+            else:
+                self.api.items_parsed += len(body.get('items', []))
+        if not_modified:
+            raise HttpError(FakeResponse(304, "Not Modified"), b"")
+        return dict(body, etag=etag)
+
+class FakeResource:
+    def __init__(self, api, name):
+        self.api = api
+        self.name = name
+
+    def list(self, **params):
+        return FakeRequest(self.api, f"{self.name}.list", params)
+
+class FakeYouTube:
+    """Just enough of the Data API for discovery: channels, uploads playlists, search, videos"""
+
+    def __init__(self, channels, uploads_per_channel=8):
+        self.uploads = {}  # channel title -> [(video_id, published)] newest first
+        for c, title in enumerate(channels):
+            self.uploads[title] = [(f"v{c:02d}{n:02d}", f"2099-01-{28 - n:02d}T10:00:00Z")
+                                   for n in range(uploads_per_channel)]
+        self.requests = self.not_modified = self.items_parsed = 0
+        self.lock = threading.Lock()
+        self.latency = 0.0        # Seconds per request
+        self.rate_limits = 0      # Next N requests answer 429
+        self.quota_after = None   # quotaExceeded once this many requests were made
+
+    def before_request(self):
+        time.sleep(self.latency)
+        with self.lock:
+            if self.quota_after is not None and self.requests >= self.quota_after:
+                self.requests += 1
+                raise HttpError(FakeResponse(403, "quotaExceeded"),
+                                b'{"error": {"message": "quotaExceeded", "errors": [{"reason": "quotaExceeded"}]}}')
+            if self.rate_limits:
+                self.rate_limits -= 1
+                self.requests += 1
+                raise HttpError(FakeResponse(429, "rateLimitExceeded"),
+                                b'{"error": {"message": "rateLimitExceeded"}}')
+
+    def new_upload(self, title):
+        count = len(self.uploads[title])
+        self.uploads[title].insert(0, (f"{title[:3]}new{count}", "2099-01-29T10:00:00Z"))
+
+    def _channel_id(self, title):
+        return "UC" + hashlib.md5(title.encode()).hexdigest()[:22]
+
+    def _title(self, channel_id):
+        return next(t for t in self.uploads if self._channel_id(t) == channel_id)
+
+    def _published(self, video_id):
+        return next(published for uploads in self.uploads.values() for vid, published in uploads if vid == video_id)
+
+    def respond(self, endpoint, params):
+        if endpoint == "search.list" and params.get('type') == 'channel':
+            return {'items': [{'snippet': {'title': params['q'], 'channelId': self._channel_id(params['q'])}}]}
+        if endpoint == "channels.list":
+            return {'items': [{'id': params['id'], 'snippet': {'title': self._title(params['id'])},
+                               'contentDetails': {'relatedPlaylists': {'uploads': "UU" + params['id'][2:]}}}]}
+        if endpoint == "playlistItems.list":
+            title = self._title("UC" + params['playlistId'][2:])
+            return {'items': [{'snippet': {'title': f"{title} episode {vid}"},
+                               'contentDetails': {'videoId': vid, 'videoPublishedAt': published}}
+                              for vid, published in self.uploads[title][:params['maxResults']]]}
+        if endpoint == "videos.list":
+            return {'items': [{'id': vid, 'statistics': {'viewCount': str(int(hashlib.md5(vid.encode()).hexdigest()[:5], 16))},
+                               'contentDetails': {'duration': 'PT45M'},
+                               'snippet': {'title': f"Episode {vid}", 'publishedAt': self._published(vid)}}
+                              for vid in params['id'].split(',')]}
+        raise ValueError(f"FakeYouTube does not implement {endpoint} {params}")
+
+    def search(self): return FakeResource(self, "search")
+    def channels(self): return FakeResource(self, "channels")
+    def playlistItems(self): return FakeResource(self, "playlistItems")
+    def videos(self): return FakeResource(self, "videos")
+
+def run_discovery(api, label):
+    api.requests = api.not_modified = api.items_parsed = 0
+    used_before = youtube_api.get_ledger().used()
+    winner = youtube_automation.find_top_viral_video_from_all_channels({'uploaded_videos': []})
+    units = youtube_api.get_ledger().used() - used_before
+    return {'run': label, 'requests': api.requests, 'not_modified': api.not_modified,
+            'items_parsed': api.items_parsed, 'units': units,
+            'winner': winner['video_id'] if winner else None}
+
+def fresh_workspace(api, monkeypatch, folder):
+    """Scratch folder with empty caches/cursors and a big ledger, discovery wired to `api`"""
+    folder.mkdir(parents=True, exist_ok=True)
+    monkeypatch.chdir(folder)
+    monkeypatch.setattr(youtube_automation, "build", lambda *args, **kwargs: api)
+    monkeypatch.setattr(youtube_api, "_ledger", youtube_api.QuotaLedger(daily_quota=1_000_000))
+
+def quietly(fn, *args):
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    try:
+        return fn(*args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def test_discovery_cursors(monkeypatch, tmp_path):
+    api = FakeYouTube(youtube_automation.INDIAN_PODCAST_CHANNELS)
+    fresh_workspace(api, monkeypatch, tmp_path)
+
+    def runs():
+        results = [run_discovery(api, "cold start")]
+        results.append(run_discovery(api, "unchanged"))
+        api.new_upload(youtube_automation.INDIAN_PODCAST_CHANNELS[3])
+        results.append(run_discovery(api, "1 new upload"))
+        return results
+    results = quietly(runs)
+
+    print(f"{'Run':<14}{'Requests':>10}{'304s':>7}{'Parsed':>8}{'Units':>8}  Winner")
+    for r in results:
+        print(f"{r['run']:<14}{r['requests']:>10}{r['not_modified']:>7}{r['items_parsed']:>8}{r['units']:>8}  {r['winner']}")
+
+    cold, unchanged, changed = results
+    assert unchanged['not_modified'] == len(youtube_automation.INDIAN_PODCAST_CHANNELS)
+    assert unchanged['winner'] == cold['winner']
+    assert changed['not_modified'] == len(youtube_automation.INDIAN_PODCAST_CHANNELS) - 1
+    print("\n✅ Cursors: unchanged channels parsed nothing, winner stable")
+
+def test_concurrent_scan(monkeypatch, tmp_path, latency=0.1):
+    monkeypatch.setattr(youtube_api, "BACKOFF_SECONDS", 0.01)
+    timings = {}
+    winners = set()
+    for workers in (1, youtube_automation.DISCOVERY_WORKERS):
+        api = FakeYouTube(youtube_automation.INDIAN_PODCAST_CHANNELS)
+        fresh_workspace(api, monkeypatch, tmp_path / f"workers_{workers}")
+        quietly(run_discovery, api, "warm up")  # resolve channels
+        api.latency = latency
+        api.rate_limits = 3
+        monkeypatch.setattr(youtube_automation, "DISCOVERY_WORKERS", workers)
+        t0 = time.time()
+        winners.add(quietly(run_discovery, api, "scan")['winner'])
+        timings[workers] = time.time() - t0
+
+    print(f"\n{'Workers':<10}{'Seconds':>9}  ({latency * 1000:.0f} ms per request, 3 injected 429s)")
+    for workers, seconds in timings.items():
+        print(f"{workers:<10}{seconds:>9.2f}")
+    assert len(winners) == 1, winners
+    print(f"✅ Same winner either way ({winners.pop()}), {timings[1] / timings[max(timings)]:.1f}x faster")
+
+    api.quota_after = 5  # run_discovery resets the request count
+    api.latency = 0
+    for path in os.listdir('.'):
+        if path.startswith('discovery_cursors'):
+            os.remove(path)
+    result = quietly(run_discovery, api, "quota")
+    made = result['requests']
+    assert made <= 5 + youtube_automation.DISCOVERY_WORKERS, made
+    print(f"✅ quotaExceeded stopped the scan after {made} requests without raising")
+
+if __name__ == "__main__":
+    import pytest
+    for test in (test_discovery_cursors, test_concurrent_scan):
+        # Patches are undone (cwd first) before the scratch folder goes
+        with tempfile.TemporaryDirectory(prefix="discovery_test_") as folder, \
+                pytest.MonkeyPatch.context() as monkeypatch:
+            test(monkeypatch, Path(folder))
@@ -0,0 +1,66 @@
+"""
+Two-phase download check against local media, no network needed.
+Builds a synthetic source with ffmpeg (test pattern + tone), serves it with
+download_manager.serve_media() (HTTP Range support) and runs the real
+download path through yt-dlp:
+    phase 1 - download_audio_proxy
+    phase 2 - download_section for one range, checked for its length
+
+Needs ffmpeg and yt-dlp installed.
+Usage: python test_download.py [source seconds]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+import media_probe
+from download_manager import serve_media, download_audio_proxy, download_section
+
+SECTION = (12.0, 20.0)    # Range fetched in phase 2
+TOLERANCE_SECONDS = 0.5   # Section length may differ by about a frame/packet
+
+def make_source(path, seconds):
+    """640x360 30fps test pattern with a stereo tone, faststart so ranges can be read"""
+    subprocess.run(['ffmpeg', '-v', 'error', '-y',
+                    '-f', 'lavfi', '-i', f'testsrc2=size=640x360:rate=30:duration={seconds}',
+                    '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={seconds}',
+                    '-ac', '2', '-c:v', 'libx264', '-preset', 'veryfast', '-g', '60',
+                    '-c:a', 'aac', '-shortest', '-movflags', '+faststart', path],
+                   check=True)
+    return path
+
+def test_two_phase_download(seconds=40):
+    work = tempfile.mkdtemp(prefix="download_test_")
+    media = os.path.join(work, "media")
+    out = os.path.join(work, "out")
+    os.makedirs(media)
+    os.makedirs(out)
+    make_source(os.path.join(media, "source.mp4"), seconds)
+
+    server, base_url = serve_media(media)
+    url = f"{base_url}/source.mp4"
+    print(f"📡 Serving synthetic {seconds}s source at {url}\n")
+    try:
+        proxy = download_audio_proxy(url, os.path.join(out, "source_audio"))
+        assert proxy and os.path.getsize(proxy) > 0, "phase 1 produced no file"
+
+        start, end = SECTION
+        section = download_section(url, start, end, os.path.join(out, f"source_{int(start)}s.mp4"))
+        assert section and os.path.exists(section), "phase 2 produced no file"
+        length = media_probe.duration(section)
+        print(f"📏 Section length: {length:.2f}s (asked for {end - start:.2f}s)")
+        assert abs(length - (end - start)) <= TOLERANCE_SECONDS, length
+
+        # Already on disk: neither phase downloads again
+        assert download_audio_proxy(url, os.path.join(out, "source_audio")) == proxy
+        assert download_section(url, start, end, section) == section
+        print("\n✅ Two-phase download works end to end against local media")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_two_phase_download(*[int(a) for a in sys.argv[1:2]])
@@ -1,6 +1,6 @@
 import os
 import sys
-from youtube_automation import opus_clip_viral_analysis, transcribe_video
+from youtube_automation import opus_clip_viral_analysis, transcribe_video, compare_analysis_modes
 
 def test_ai_on_local_file(file_path):
     print(f"🧪 Testing Opus Clip AI on: {file_path}")
@@ -19,5 +19,10 @@ def test_ai_on_local_file(file_path):
 
 if __name__ == "__main__":
     # Use the first argument or a default file
-    target = sys.argv[1] if len(sys.argv) > 1 else r"clips\final_TUDAhyaYS9g.mp4"
-    test_ai_on_local_file(target)
+    # --compare: full transcription vs two-stage picks & runtime report
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    target = args[0] if args else r"clips\final_TUDAhyaYS9g.mp4"
+    if "--compare" in sys.argv:
+        compare_analysis_modes(target)
+    else:
+        test_ai_on_local_file(target)
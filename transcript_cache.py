@@ -0,0 +1,125 @@
+"""
+Transcript Cache
+On-disk Whisper results keyed by media content hash + model + language +
+word_timestamps, stored as zlib-compressed compact JSON with size-bounded
+(least recently used) eviction and a persistent hit/miss counter.
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import threading
+
+CACHE_FOLDER = os.environ.get("TRANSCRIPT_CACHE_DIR", os.path.join("temp", "transcript_cache"))
+CACHE_MAX_BYTES = int(float(os.environ.get("TRANSCRIPT_CACHE_MAX_MB", 256)) * 1024 * 1024)
+STATS_FILE = "stats.json"
+HASH_CHUNK = 1024 * 1024
+
+# Content hashes already computed this process, keyed by (path, size, mtime)
+_hash_memo = {}
+_lock = threading.Lock()
+
+def media_hash(path):
+    """SHA-256 of the file contents (memoized while the file is unchanged)"""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if memo_key in _hash_memo:
+        return _hash_memo[memo_key]
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(block)
+    digest = h.hexdigest()
+    _hash_memo[memo_key] = digest
+    return digest
+
+def cache_key(path, model, language, word_timestamps):
+    raw = f"{media_hash(path)}|{model}|{language}|{int(bool(word_timestamps))}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:40]
+
+def _entry_path(key):
+    return os.path.join(CACHE_FOLDER, f"{key}.json.z")
+
+def _jsonable(obj):
+    # Whisper can hand back NumPy scalars/arrays
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+def _load_stats():
+    try:
+        with open(os.path.join(CACHE_FOLDER, STATS_FILE), 'r') as f:
+            return json.load(f)
+    except:
+        return {'hits': 0, 'misses': 0}
+
+def _bump(counter):
+    stats = _load_stats()
+    stats[counter] = stats.get(counter, 0) + 1
+    tmp = os.path.join(CACHE_FOLDER, STATS_FILE + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump(stats, f)
+    os.replace(tmp, os.path.join(CACHE_FOLDER, STATS_FILE))
+
+def stats():
+    """{'hits': n, 'misses': n, 'entries': n, 'bytes': n}"""
+    result = _load_stats()
+    entries = _entries()
+    result['entries'] = len(entries)
+    result['bytes'] = sum(size for _, size, _ in entries)
+    return result
+
+def get(path, model, language, word_timestamps):
+    """Cached transcript dict, or None on a miss"""
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    entry = _entry_path(cache_key(path, model, language, word_timestamps))
+    with _lock:
+        try:
+            with open(entry, 'rb') as f:
+                result = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        except (OSError, ValueError, zlib.error):
+            _bump('misses')
+            return None
+        # Touch so eviction treats it as recently used
+        os.utime(entry, None)
+        _bump('hits')
+    return result
+
+def put(path, model, language, word_timestamps, result):
+    """Store a transcript, then evict oldest entries beyond the size budget"""
+    if result is None:
+        return
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    entry = _entry_path(cache_key(path, model, language, word_timestamps))
+    data = json.dumps(result, separators=(',', ':'), ensure_ascii=False, default=_jsonable)
+    with _lock:
+        tmp = entry + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(zlib.compress(data.encode('utf-8'), 6))
+        os.replace(tmp, entry)
+        evict()
+
+def _entries():
+    if not os.path.isdir(CACHE_FOLDER):
+        return []
+    entries = []
+    for name in os.listdir(CACHE_FOLDER):
+        if name.endswith(".json.z"):
+            st = os.stat(os.path.join(CACHE_FOLDER, name))
+            entries.append((name, st.st_size, st.st_mtime))
+    return entries
+
+def evict(max_bytes=CACHE_MAX_BYTES):
+    """Delete least recently used entries until the cache fits in max_bytes"""
+    entries = sorted(_entries(), key=lambda e: e[2])
+    total = sum(size for _, size, _ in entries)
+    for name, size, _ in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(CACHE_FOLDER, name))
+            total -= size
+        except OSError:
+            pass
@@ -0,0 +1,71 @@
+"""
+Transcript Index
+Sorted-interval index over Whisper segments so any [start, end) range can be
+looked up with bisect instead of rescanning every segment.
+"""
+
+from bisect import bisect_left
+
+def segment_words(segment):
+    """Word timings of a segment (spread evenly over the segment if Whisper gave none)"""
+    if 'words' in segment:
+        return segment['words']
+    w_text = segment.get('text', '').strip()
+    return [{'word': w, 'start': segment.get('start', 0), 'end': segment.get('end', 0)}
+            for w in w_text.split()]
+
+class TranscriptIndex:
+    """Whisper segments sorted by start time with bisect lookups"""
+
+    def __init__(self, transcript):
+        segments = []
+        if transcript and 'segments' in transcript:
+            segments = sorted(transcript['segments'], key=lambda s: s.get('start', 0))
+        self.segments = segments
+        self.starts = [s.get('start', 0) for s in segments]
+        # Longest segment bounds how far back an overlapping segment can start
+        self.max_length = max((s.get('end', 0) - s.get('start', 0) for s in segments), default=0)
+
+    @classmethod
+    def of(cls, transcript):
+        """Reuse an existing index or build one from a transcript dict"""
+        if isinstance(transcript, cls):
+            return transcript
+        return cls(transcript)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def segments_starting(self, start, end):
+        """Segments whose start falls inside [start, end)"""
+        lo = bisect_left(self.starts, start)
+        hi = bisect_left(self.starts, end)
+        return self.segments[lo:hi]
+
+    def segments_overlapping(self, start, end):
+        """Segments that overlap [start, end) at all"""
+        lo = bisect_left(self.starts, start - self.max_length)
+        hi = bisect_left(self.starts, end)
+        return [s for s in self.segments[lo:hi] if s.get('end', 0) > start or s.get('start', 0) >= start]
+
+    def text(self, start=None, end=None):
+        """Text of the segments starting inside [start, end) (whole transcript if no range)"""
+        if start is None and end is None:
+            segs = self.segments
+        else:
+            segs = self.segments_starting(start or 0, end if end is not None else float('inf'))
+        return " ".join(s.get('text', '').strip() for s in segs).strip()
+
+    def words(self, start, end):
+        """Word dicts whose start falls inside [start, end)"""
+        found = []
+        for seg in self.segments_overlapping(start, end):
+            found.extend(w for w in segment_words(seg) if start <= w['start'] < end)
+        return found
+
+    def overlap(self, start, end):
+        """Seconds of speech inside [start, end)"""
+        total = 0.0
+        for seg in self.segments_overlapping(start, end):
+            total += max(0.0, min(seg.get('end', 0), end) - max(seg.get('start', 0), start))
+        return total
@@ -0,0 +1,127 @@
+"""
+Transcription Backends
+One interface, one output schema, several engines:
+- openai-whisper : the original PyTorch Whisper
+- faster-whisper : CTranslate2 Whisper with int8 CPU inference
+                   (optional: pip install faster-whisper)
+- stub           : deterministic fake transcript for offline benchmarking
+
+Every backend returns:
+    {'text': str, 'language': str,
+     'segments': [{'id', 'start', 'end', 'text',
+                   'words': [{'word', 'start', 'end', 'probability'}]}]}
+
+Select with TRANSCRIBE_BACKEND (default: openai-whisper).
+"""
+
+import os
+import media_probe
+
+DEFAULT_BACKEND = os.environ.get("TRANSCRIBE_BACKEND", "openai-whisper")
+SAMPLE_RATE = 16000  # Whisper input rate for raw audio arrays
+
+def audio_duration(audio):
+    """Seconds of audio in a file path or 16kHz sample array"""
+    if isinstance(audio, str):
+        return media_probe.duration(audio)
+    return len(audio) / float(SAMPLE_RATE)
+
+class TranscriptionBackend:
+    """Loads its model once in __init__; transcribe() may be called many times"""
+    name = "base"
+
+    def __init__(self, model="small"):
+        self.model_name = model
+
+    def transcribe(self, audio, language="hi", word_timestamps=True):
+        """audio = file path or float32 16kHz mono array"""
+        raise NotImplementedError
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    name = "openai-whisper"
+
+    def __init__(self, model="small"):
+        super().__init__(model)
+        import whisper
+        self.model = whisper.load_model(model)
+
+    def transcribe(self, audio, language="hi", word_timestamps=True):
+        # Native output already has this schema (plus extra per-segment fields)
+        return self.model.transcribe(audio, language=language, word_timestamps=word_timestamps)
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """CTranslate2 Whisper, int8 weights on CPU (several times faster than PyTorch fp32)"""
+    name = "faster-whisper"
+
+    def __init__(self, model="small", compute_type=None):
+        super().__init__(model)
+        from faster_whisper import WhisperModel
+        compute_type = compute_type or os.environ.get("FASTER_WHISPER_COMPUTE", "int8")
+        threads = int(os.environ.get("FASTER_WHISPER_THREADS", 0))
+        self.model = WhisperModel(model, device="cpu", compute_type=compute_type, cpu_threads=threads)
+
+    def transcribe(self, audio, language="hi", word_timestamps=True):
+        seg_iter, info = self.model.transcribe(audio, language=language, word_timestamps=word_timestamps)
+        segments = []
+        for i, seg in enumerate(seg_iter):
+            segment = {'id': i, 'start': seg.start, 'end': seg.end, 'text': seg.text}
+            if word_timestamps:
+                segment['words'] = [{'word': w.word, 'start': w.start, 'end': w.end,
+                                     'probability': w.probability} for w in (seg.words or [])]
+            segments.append(segment)
+        return {
+            'text': ''.join(seg['text'] for seg in segments),
+            'segments': segments,
+            'language': info.language
+        }
+
+class StubBackend(TranscriptionBackend):
+    """
+    No model at all: cycles through fixed Hinglish lines, one 5s segment at a
+    time, with evenly spaced words. Same input length -> same transcript.
+    """
+    name = "stub"
+    LINES = [
+        "Dekho bhai ye secret koi nahi batata",
+        "Why does everyone think this is crazy",
+        "Sach bolo kya tumne kabhi socha hai",
+        "This is actually the best advice ever",
+        "Are bhai what happened next was insane",
+        "Suno ye baat really important hai yaar",
+    ]
+    SEGMENT_SECONDS = 5.0
+
+    def transcribe(self, audio, language="hi", word_timestamps=True):
+        duration = audio_duration(audio)
+        segments = []
+        t = 0.0
+        while t < duration:
+            end = min(t + self.SEGMENT_SECONDS, duration)
+            text = self.LINES[len(segments) % len(self.LINES)]
+            tokens = text.split()
+            step = (end - t) / len(tokens)
+            words = [{'word': f" {w}", 'start': round(t + k * step, 2),
+                      'end': round(t + (k + 1) * step, 2), 'probability': 1.0}
+                     for k, w in enumerate(tokens)]
+            segment = {'id': len(segments), 'start': round(t, 2), 'end': round(end, 2), 'text': f" {text}"}
+            if word_timestamps:
+                segment['words'] = words
+            segments.append(segment)
+            t = end
+        return {
+            'text': ''.join(seg['text'] for seg in segments),
+            'segments': segments,
+            'language': language
+        }
+
+BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    StubBackend.name: StubBackend,
+}
+
+def create_backend(name=DEFAULT_BACKEND, model="small"):
+    """Instantiate (and load) a backend by name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend '{name}' (choose from: {', '.join(BACKENDS)})")
+    return BACKENDS[name](model)
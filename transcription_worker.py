@@ -0,0 +1,126 @@
+"""
+Whisper Transcription Worker
+Loads the Whisper model ONCE and serves transcription jobs over a local socket,
+so scheduled slots reuse a warm model instead of cold-loading it every run.
+The engine comes from transcription_backends (TRANSCRIBE_BACKEND).
+
+Run standalone:   python transcription_worker.py [model] [backend]
+Or in-process:    start_background_worker()  (the youtube_automation and
+                  upload_from_folder schedulers do this)
+
+Jobs arrive pickled, so the worker only runs with a private
+WHISPER_WORKER_AUTHKEY set in the environment; without it, transcribe()
+uses the warm model of the calling process.
+"""
+
+import os
+import sys
+import threading
+from multiprocessing.connection import Listener, Client
+from transcription_backends import create_backend, DEFAULT_BACKEND
+
+WORKER_HOST = "127.0.0.1"
+WORKER_PORT = int(os.environ.get("WHISPER_WORKER_PORT", 6011))
+WORKER_AUTHKEY = os.environ.get("WHISPER_WORKER_AUTHKEY", "").encode()
+DEFAULT_MODEL = "small"
+
+# Warm backends for this process, keyed by (backend, model)
+_models = {}
+_model_lock = threading.Lock()
+# Models are not thread-safe, so jobs run one at a time
+_job_lock = threading.Lock()
+
+def get_model(name=DEFAULT_MODEL, backend=DEFAULT_BACKEND):
+    """Load a backend model the first time it is asked for, then reuse it"""
+    with _model_lock:
+        if (backend, name) not in _models:
+            print(f"🧠 Loading {backend} '{name}' model...")
+            _models[(backend, name)] = create_backend(backend, name)
+        return _models[(backend, name)]
+
+def run_job(path, language="hi", word_timestamps=True, model=DEFAULT_MODEL, backend=DEFAULT_BACKEND):
+    """Transcribe with this process's warm model"""
+    engine = get_model(model, backend)
+    with _job_lock:
+        return engine.transcribe(path, language=language, word_timestamps=word_timestamps)
+
+def _handle(conn):
+    try:
+        job = conn.recv()
+        if job.get("cmd") == "ping":
+            conn.send({"ok": True, "models": [f"{b}:{m}" for b, m in _models]})
+            return
+        result = run_job(job["path"], job.get("language", "hi"), job.get("word_timestamps", True),
+                         job.get("model", DEFAULT_MODEL), job.get("backend", DEFAULT_BACKEND))
+        conn.send({"ok": True, "result": result})
+    except EOFError:
+        pass
+    except Exception as e:
+        try:
+            conn.send({"ok": False, "error": f"{type(e).__name__}: {e}"})
+        except Exception:
+            pass
+    finally:
+        conn.close()
+
+def serve(model=DEFAULT_MODEL, backend=DEFAULT_BACKEND, host=WORKER_HOST, port=WORKER_PORT):
+    """Preload the model and answer jobs until the process exits"""
+    if not WORKER_AUTHKEY:
+        raise RuntimeError("WHISPER_WORKER_AUTHKEY is not set - refusing to accept pickled jobs")
+    with Listener((host, port), authkey=WORKER_AUTHKEY) as listener:
+        print(f"🎤 Whisper worker listening on {host}:{port}")
+        get_model(model, backend)
+        print(f"✅ {backend} '{model}' warm - ready for jobs")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print(f"⚠️  Worker accept failed: {e}")
+                continue
+            threading.Thread(target=_handle, args=(conn,), daemon=True).start()
+
+def start_background_worker(model=DEFAULT_MODEL, backend=DEFAULT_BACKEND):
+    """Run the worker on a daemon thread of the current process"""
+    def _run():
+        try:
+            serve(model, backend)
+        except (OSError, RuntimeError) as e:
+            # Port taken = another worker is already serving; no key = not allowed to serve
+            print(f"ℹ️  Whisper worker not started here: {e}")
+        except Exception as e:
+            print(f"⚠️  Whisper worker stopped: {e}")
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    return thread
+
+def transcribe(path, language="hi", word_timestamps=True, model=DEFAULT_MODEL, backend=DEFAULT_BACKEND):
+    """
+    Send the job to a running worker; if none is listening, fall back to the
+    warm model of this process (loaded once, reused by later calls).
+    """
+    if not WORKER_AUTHKEY:
+        return run_job(path, language, word_timestamps, model, backend)
+    try:
+        conn = Client((WORKER_HOST, WORKER_PORT), authkey=WORKER_AUTHKEY)
+    except OSError:
+        return run_job(path, language, word_timestamps, model, backend)
+
+    with conn:
+        conn.send({
+            "cmd": "transcribe",
+            "path": os.path.abspath(path),
+            "language": language,
+            "word_timestamps": word_timestamps,
+            "model": model,
+            "backend": backend,
+        })
+        reply = conn.recv()
+
+    if not reply.get("ok"):
+        raise RuntimeError(f"Whisper worker failed: {reply.get('error')}")
+    return reply["result"]
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL,
+          sys.argv[2] if len(sys.argv) > 2 else DEFAULT_BACKEND)
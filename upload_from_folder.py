@@ -15,6 +15,9 @@ import sys
 from datetime import datetime
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
+from transcript_index import TranscriptIndex
+import transcription_worker
+import youtube_api
 
 # Import necessary functions from the main automation script
 try:
@@ -24,7 +27,9 @@ try:
         detect_viral_keywords, 
         load_upload_history, 
         save_upload_history,
-        UPLOAD_HISTORY_FILE
+        UPLOAD_HISTORY_FILE,
+        WHISPER_MODEL,
+        TRANSCRIBE_BACKEND
     )
 except ImportError:
     print("❌ Critical: Could not import from youtube_automation.py")
@@ -53,8 +58,8 @@ def generate_seo_from_transcript(transcript):
     desc_text = "Viral Video! Subscribe for more."
     tags = ['shorts', 'viral', 'trending']
 
-    if transcript and 'text' in transcript:
-        full_text = transcript['text'].strip()
+    if transcript:
+        full_text = TranscriptIndex(transcript).text()
         _, keywords = detect_viral_keywords(full_text)
         
         if keywords:
@@ -110,6 +115,11 @@ def run_scheduled_upload():
         except: pass
         return
 
+    # Transcribing is wasted if today's quota can't pay for the upload
+    if not youtube_api.can_start_slot(youtube_api.UPLOAD_COST):
+        print(f"⏸️  Skipping slot - {youtube_api.get_ledger().summary()}, upload needs {youtube_api.UPLOAD_COST}")
+        return
+
     print(f"🎬 Starting upload for: {filename}")
 
     # 1. Seo
@@ -145,6 +155,7 @@ def run_scheduled_upload():
             if status:
                 print(f"      🚀 {int(status.progress() * 100)}%")
 
+        youtube_api.get_ledger().spend("videos.insert")
         print(f"   ✅ Success! https://youtube.com/shorts/{response['id']}")
 
         # 3. Update History
@@ -182,6 +193,9 @@ def main():
     print("✅ Status: WAITING for next slot...")
     print("="*50)
 
+    # Warm Whisper worker for the slots (and any other local process)
+    transcription_worker.start_background_worker(WHISPER_MODEL, TRANSCRIBE_BACKEND)
+    
     # Schedule
     schedule.every().day.at("08:00").do(run_scheduled_upload)
     schedule.every().day.at("20:00").do(run_scheduled_upload)
@@ -8,6 +8,13 @@ import json
 import subprocess
 import sys
 from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from download_manager import DOWNLOAD_MODE, download_audio_proxy, download_section
+import media_probe
+import clip_selector
+import numpy as np
+from media_features import extract_audio_envelope
 
 # Fix for Windows console encoding
 sys.stdout.reconfigure(encoding='utf-8')
@@ -34,6 +41,28 @@ CLIP_DURATION = 45  # Target duration in seconds (30-60 recommended)
 OUTPUT_WIDTH = 1080
 OUTPUT_HEIGHT = 1920
 BLUR_SIGMA = 20  # Gaussian blur strength
+LOUDNESS_FLOOR_DB = -60  # Quieter than this scores 0 when picking moments
+
+# "parallel" = one ffmpeg per short on a worker pool, "batch" = all shorts from one ffmpeg
+RENDER_STRATEGY = os.environ.get("RENDER_STRATEGY", "parallel")
+WAIT_FOR_END_IMAGE = "wait_for_end.jpg"
+
+# Parallel rendering: 0 = size from cores & memory
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", 0))
+RENDER_MEMORY_PER_JOB_MB = 700   # Peak RSS of one 1080x1920 blurred-background encode
+MIN_THREADS_PER_JOB = 2          # libx264 scales poorly below this per clip
+
+# Render quality profiles. The background is blurred anyway, so it can be
+# built from bg_fps frames/s (repeated back up to the source rate) at
+# 1/bg_scale resolution and upscaled - the full-size gblur is the most
+# expensive filter in the graph.
+# "final" is the original full-resolution render.
+RENDER_PROFILES = {
+    "draft": {"bg_scale": 8, "bg_fps": 10, "preset": "ultrafast", "crf": 28},
+    "fast":  {"bg_scale": 4, "bg_fps": None, "preset": "veryfast", "crf": 23},
+    "final": {"bg_scale": 1, "bg_fps": None, "preset": "medium", "crf": 23},
+}
+RENDER_PROFILE = os.environ.get("RENDER_PROFILE", "final")
 
 def get_video_id(url):
     """Extract video ID from YouTube URL"""
@@ -76,33 +105,20 @@ def download_video(url, output_folder):
     return None
 
 def get_video_duration(video_path):
-    """Get video duration in seconds using ffmpeg (since ffprobe might be missing)"""
-    cmd = [
-        "ffmpeg", "-i", video_path
-    ]
-    # ffmpeg returns non-zero exit code when no output file is provided, which is expected here
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    # Parse duration from stderr: "Duration: 00:05:03.25,"
-    import re
-    duration_match = re.search(r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})", result.stderr)
-    if duration_match:
-        hours = int(duration_match.group(1))
-        minutes = int(duration_match.group(2))
-        seconds = float(duration_match.group(3))
-        return hours * 3600 + minutes * 60 + seconds
-    
-    return 0.0
+    """Get video duration in seconds (memoized probe, falls back to ffmpeg without ffprobe)"""
+    return media_probe.duration(video_path)
 
-def detect_viral_moments(video_path, num_clips=5, clip_duration=45):
-    """
-    Detect potential viral moments in the video.
-    Uses equal distribution + random offset for variety.
-    Returns list of start times.
-    """
-    total_duration = get_video_duration(video_path)
-    print(f"📊 Video duration: {total_duration/60:.1f} minutes")
-    
+def loudness_per_second(video_path):
+    """Per-second loudness score 0-10 (mean + peak dB) from one PCM decode, None without audio"""
+    envelope = extract_audio_envelope(video_path)
+    if envelope is None:
+        return None
+    mean_db, max_db = envelope.window_levels(1)
+    mean_db, max_db = (np.clip(db, LOUDNESS_FLOOR_DB, 0) for db in (mean_db, max_db))
+    return ((mean_db - LOUDNESS_FLOOR_DB) + (max_db - LOUDNESS_FLOOR_DB)) / (-LOUDNESS_FLOOR_DB * 2) * 10
+
+def spaced_moments(total_duration, num_clips, clip_duration):
+    """Equal distribution fallback when there is nothing to score"""
     # Skip first 30 seconds (usually intro) and last 30 seconds (usually outro)
     usable_start = 30
     usable_end = total_duration - 30 - clip_duration
@@ -126,6 +142,36 @@ def detect_viral_moments(video_path, num_clips=5, clip_duration=45):
             "score": 8.5 - (i * 0.2),  # Simulated viral score
             "label": f"Viral Moment {i+1}"
         })
+    return moments
+
+def detect_viral_moments(video_path, num_clips=5, clip_duration=45):
+    """
+    Detect potential viral moments in the video.
+    Every possible start is scored by the loudness of its whole clip and the
+    best non-overlapping clips are kept (best first). Without audio, moments
+    are spread evenly.
+    """
+    total_duration = get_video_duration(video_path)
+    print(f"📊 Video duration: {total_duration/60:.1f} minutes")
+    
+    moments = []
+    loudness = loudness_per_second(video_path)
+    if loudness is not None and loudness.size >= clip_duration:
+        # Skip first/last 30 seconds (intro/outro) when the video is long enough
+        allowed = np.ones(loudness.size - int(round(clip_duration)) + 1, dtype=bool)
+        if allowed.size > 60 + num_clips * clip_duration:
+            allowed[:30] = False
+            allowed[-30:] = False
+        clips = clip_selector.select_clips(loudness, clip_duration, num_clips, allowed=allowed)
+        moments = [{
+            "start": float(clip['start']),
+            "duration": clip_duration,
+            "score": round(clip['score'], 2),
+            "label": f"Viral Moment {i+1}"
+        } for i, clip in enumerate(clips)]
+    
+    if not moments:
+        moments = spaced_moments(total_duration, num_clips, clip_duration)
     
     print(f"🎯 Detected {len(moments)} viral moments")
     for m in moments:
@@ -135,12 +181,71 @@ def detect_viral_moments(video_path, num_clips=5, clip_duration=45):
     
     return moments
 
-def create_blurred_background_short(input_video, output_path, start_time, duration):
+def get_render_profile(name=None):
+    """Profile settings by name (default RENDER_PROFILE)"""
+    name = name or RENDER_PROFILE
+    if name not in RENDER_PROFILES:
+        print(f"⚠️ Unknown render profile '{name}', using 'final'")
+        name = "final"
+    return RENDER_PROFILES[name]
+
+def source_frame_rate(path):
+    """Frame rate of a source ('30000/1001' from ffprobe, else fps as a number), None if unknown"""
+    video = media_probe.video_stream(path) or {}
+    return video.get('r_frame_rate') or video.get('fps')
+
+def background_filter(profile=None, source_fps=None):
+    """
+    Filter chain: source frames -> 1080x1920 blurred background, per profile.
+    A reduced bg_fps drops frames first, so scale/crop/blur only run on the
+    kept ones. The background is the overlay's main input and sets the
+    output frame rate, so the source rate is restored after the upscale;
+    without a known source_fps the frame rate is left alone.
+    """
+    profile = get_render_profile(profile)
+    scale = profile['bg_scale']
+    width, height = OUTPUT_WIDTH // scale, OUTPUT_HEIGHT // scale
+    reduce_fps = profile['bg_fps'] and profile['bg_fps'] < (media_probe.parse_rate(str(source_fps)) or 0)
+    chain = f"fps={profile['bg_fps']}," if reduce_fps else ""
+    chain += (f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+              f"crop={width}:{height},gblur=sigma={BLUR_SIGMA / scale:g}")
+    if scale > 1:
+        chain += f",scale={OUTPUT_WIDTH}:{OUTPUT_HEIGHT}"
+    if reduce_fps:
+        chain += f",fps={source_fps}"
+    return chain
+
+def encoder_args(profile=None):
+    profile = get_render_profile(profile)
+    return ["-c:v", "libx264", "-preset", profile['preset'], "-crf", str(profile['crf'])]
+
+def blurred_background_filter(profile=None, source_fps=None):
+    """filter_complex of one short: input 0 = source video, input 1 = overlay image"""
+    return (
+        # Background: scale, crop, blur (reduced size for faster profiles)
+        f"[0:v]{background_filter(profile, source_fps)}[bg];"
+        
+        # Foreground: scale, saturation boost
+        f"[0:v]scale=1080:-2:force_original_aspect_ratio=decrease,"
+        f"eq=saturation=1.2[fg];"
+        
+        # Image: scale to 800px width
+        f"[1:v]scale=800:-1[img];"
+        
+        # Overlay -> Vignette -> Image Overlay
+        f"[bg][fg]overlay=(W-w)/2:(H-h)/2,"
+        f"vignette=PI/4[comp];"
+        f"[comp][img]overlay=(W-w)/2:150[outv]"
+    )
+
+def create_blurred_background_short(input_video, output_path, start_time, duration, threads=None, profile=None):
     """
     Create a short with blurred background effect.
     - Main video centered
     - Blurred/scaled version as background
     - 9:16 aspect ratio (1080x1920)
+    threads: cap for this ffmpeg's filter + encoder threads (parallel renders)
+    profile: RENDER_PROFILES name (default RENDER_PROFILE)
     """
     print(f"🎬 Creating short: {os.path.basename(output_path)}")
     
@@ -164,26 +269,10 @@ def create_blurred_background_short(input_video, output_path, start_time, durati
     # 5. Vignette effect
     # 6. Overlay Image "Wait for end" on top
     
-    image_path = "wait_for_end.jpg"
+    image_path = WAIT_FOR_END_IMAGE
     # Fallback if image missing? Use text? For now assume image is there as we will commit it.
     
-    filter_complex = (
-        # Background: scale, crop, blur
-        f"[0:v]scale=1080:1920:force_original_aspect_ratio=increase,"
-        f"crop=1080:1920,gblur=sigma={BLUR_SIGMA}[bg];"
-        
-        # Foreground: scale, saturation boost
-        f"[0:v]scale=1080:-2:force_original_aspect_ratio=decrease,"
-        f"eq=saturation=1.2[fg];"
-        
-        # Image: scale to 800px width
-        f"[1:v]scale=800:-1[img];"
-        
-        # Overlay -> Vignette -> Image Overlay
-        f"[bg][fg]overlay=(W-w)/2:(H-h)/2,"
-        f"vignette=PI/4[comp];"
-        f"[comp][img]overlay=(W-w)/2:150[outv]"
-    )
+    filter_complex = blurred_background_filter(profile, source_frame_rate(input_video))
     
     cmd = [
         "ffmpeg", "-y",
@@ -194,9 +283,11 @@ def create_blurred_background_short(input_video, output_path, start_time, durati
         "-filter_complex", filter_complex,
         "-map", "[outv]",
         "-map", "0:a",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "23",
+    ] + encoder_args(profile)
+    if threads:
+        cmd[1:1] = ["-filter_complex_threads", str(threads)]
+        cmd += ["-threads", str(threads)]
+    cmd += [
         "-c:a", "aac",
         "-b:a", "192k",
         "-movflags", "+faststart",
@@ -215,6 +306,119 @@ def create_blurred_background_short(input_video, output_path, start_time, durati
         print(f"   ✗ Error: {e}")
         return False
 
+def group_ranges(jobs):
+    """
+    [(source, start, duration), ...] -> [(source, start, end, [job index, ...]), ...]
+    Overlapping ranges of the same source are merged, so every source
+    second is decoded once
+    """
+    order = sorted(range(len(jobs)), key=lambda i: (jobs[i][0], jobs[i][1]))
+    groups = []
+    for i in order:
+        source, start, duration = jobs[i]
+        end = start + duration
+        if groups and groups[-1][0] == source and start <= groups[-1][2]:
+            groups[-1][2] = max(groups[-1][2], end)
+            groups[-1][3].append(i)
+        else:
+            groups.append([source, start, end, [i]])
+    return [tuple(g) for g in groups]
+
+def batch_filter(jobs, groups, image_input, profile=None):
+    """
+    Filtergraph for all shorts: each group input is split once per short,
+    trimmed to its moment, and that ONE decoded branch is split again into
+    the blurred background and the foreground
+    """
+    parts = [f"[{image_input}:v]scale=800:-1,split={len(jobs)}" + "".join(f"[img{i}]" for i in range(len(jobs)))]
+    for g, (source, group_start, _, members) in enumerate(groups):
+        n = len(members)
+        source_fps = source_frame_rate(source)
+        parts.append(f"[{g}:v]split={n}" + "".join(f"[v{i}]" for i in members))
+        parts.append(f"[{g}:a]asplit={n}" + "".join(f"[a{i}]" for i in members))
+        for i in members:
+            start = jobs[i][1] - group_start
+            end = start + jobs[i][2]
+            parts.append(f"[v{i}]trim=start={start:.3f}:end={end:.3f},setpts=PTS-STARTPTS,split[src{i}][fgsrc{i}]")
+            parts.append(f"[src{i}]{background_filter(profile, source_fps)}[bg{i}]")
+            parts.append(f"[fgsrc{i}]scale=1080:-2:force_original_aspect_ratio=decrease,eq=saturation=1.2[fg{i}]")
+            parts.append(f"[bg{i}][fg{i}]overlay=(W-w)/2:(H-h)/2,vignette=PI/4[comp{i}]")
+            parts.append(f"[comp{i}][img{i}]overlay=(W-w)/2:150[outv{i}]")
+            parts.append(f"[a{i}]atrim=start={start:.3f}:end={end:.3f},asetpts=PTS-STARTPTS[outa{i}]")
+    return ";".join(parts)
+
+def render_shorts_batch(jobs, output_paths, threads=None, profile=None):
+    """
+    All shorts from ONE ffmpeg process. jobs = [(source, start, duration), ...]
+    threads: total for the process (filtergraph + all encoders together).
+    Returns [success, ...] in job order.
+    """
+    groups = group_ranges(jobs)
+    print(f"🎬 Batch rendering {len(jobs)} shorts from {len(groups)} decoded range(s)")
+    # One thread budget for the whole process: the N encoders share it
+    encoder_threads = max(1, threads // len(jobs)) if threads else None
+    
+    cmd = ["ffmpeg", "-y"]
+    if threads:
+        cmd += ["-filter_complex_threads", str(threads)]
+    for source, start, end, _ in groups:
+        cmd += ["-ss", str(start), "-t", str(end - start), "-i", source]
+    cmd += ["-i", WAIT_FOR_END_IMAGE]
+    cmd += ["-filter_complex", batch_filter(jobs, groups, len(groups), profile)]
+    for i, path in enumerate(output_paths):
+        cmd += ["-map", f"[outv{i}]", "-map", f"[outa{i}]"] + encoder_args(profile)
+        if encoder_threads:
+            cmd += ["-threads", str(encoder_threads)]
+        cmd += ["-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart", path]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except Exception as e:
+        print(f"   ✗ Error: {e}")
+        return [False] * len(jobs)
+    if result.returncode != 0:
+        print(f"   ✗ FFmpeg error: {result.stderr[-300:]}")
+        return [False] * len(jobs)
+    
+    done = [os.path.exists(path) and os.path.getsize(path) > 0 for path in output_paths]
+    for path, ok in zip(output_paths, done):
+        print(f"   {'✓ Created' if ok else '✗ Missing'}: {os.path.basename(path)}")
+    return done
+
+def available_memory_mb():
+    """Free + reclaimable RAM in MB, or None where we can't tell"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def plan_render_workers(num_jobs):
+    """
+    (parallel renders, ffmpeg threads each) so that workers x threads ~= cores
+    and workers x RENDER_MEMORY_PER_JOB_MB fits in available memory
+    """
+    cores = os.cpu_count() or 1
+    workers = RENDER_WORKERS or max(1, cores // MIN_THREADS_PER_JOB)
+    memory = available_memory_mb()
+    if memory is not None:
+        workers = min(workers, max(1, memory // RENDER_MEMORY_PER_JOB_MB))
+    workers = max(1, min(workers, num_jobs))
+    return workers, max(1, cores // workers)
+
+def write_json_atomic(path, data):
+    """Write to a temp file, then rename over `path` - readers never see half a file"""
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
 def add_captions_to_short(input_video, output_path):
     """
     Add TikTok-style captions to the short.
@@ -226,9 +430,11 @@ def add_captions_to_short(input_video, output_path):
     shutil.copy(input_video, output_path)
     return True
 
-def process_video(url, num_clips=5, clip_duration=45):
-    """Main processing pipeline"""
-    
+def plan_video(url, num_clips=5, clip_duration=45):
+    """
+    Download + analysis only: the moments and how each short would be
+    rendered, nothing encoded yet. Returns None if the download failed.
+    """
     print("=" * 60)
     print("🚀 VIRAL SHORTS GENERATOR")
     print("=" * 60)
@@ -237,41 +443,159 @@ def process_video(url, num_clips=5, clip_duration=45):
     print(f"Clip duration: {clip_duration}s")
     print("=" * 60)
     
-    # Step 1: Download video
-    video_path = download_video(url, DOWNLOADS_FOLDER)
+    video_id = get_video_id(url)
+    
+    # Step 1: Download video (two-phase: audio-only proxy now, clip sections later)
+    if DOWNLOAD_MODE == "two_phase":
+        video_path = download_audio_proxy(url, os.path.join(DOWNLOADS_FOLDER, f"{video_id}_audio"))
+    else:
+        video_path = download_video(url, DOWNLOADS_FOLDER)
     if not video_path:
         print("❌ Failed to download video")
-        return []
+        return None
     
     # Step 2: Detect viral moments
     moments = detect_viral_moments(video_path, num_clips, clip_duration)
     
     # Step 3: Create output folder
-    video_id = get_video_id(url)
     output_folder = os.path.join(SHORTS_FOLDER, f"carryminati_{video_id}")
     os.makedirs(output_folder, exist_ok=True)
     
-    # Step 4: Generate shorts with blurred background
-    generated_shorts = []
+    items = [{
+        "source_url": url,
+        "video_id": video_id,
+        "video_path": video_path,
+        "two_phase": DOWNLOAD_MODE == "two_phase",
+        "start": moment['start'],
+        "duration": moment['duration'],
+        "score": moment['score'],
+        "label": moment['label'],
+        "output_path": os.path.join(output_folder, f"short_{i+1}_t{int(moment['start'])}s.mp4"),
+        "profile": RENDER_PROFILE,
+        "planned_at": datetime.now().isoformat()
+    } for i, moment in enumerate(moments)]
+    
+    return {"source_url": url, "video_id": video_id, "output_folder": output_folder, "items": items}
+
+def item_source(item):
+    """(source file, start within it) for a plan item; two-phase fetches just its range now"""
+    if not item.get('two_phase'):
+        return item['video_path'], item['start']
+    section = download_section(
+        item['source_url'], item['start'], item['start'] + item['duration'],
+        os.path.join(DOWNLOADS_FOLDER, f"{item['video_id']}_{int(item['start'])}s.mp4")
+    )
+    return (section, 0) if section else (None, 0)
+
+def clip_info(item):
+    """The dict process_video has always returned per short"""
+    return {
+        "path": item['output_path'],
+        "start_time": item['start'],
+        "duration": item['duration'],
+        "viral_score": item['score']
+    }
+
+def rendered_output(item):
+    """True if the item was rendered by an earlier slot and the short is still on disk"""
+    path = item['output_path']
+    return bool(item.get('rendered')) and os.path.exists(path) and os.path.getsize(path) > 0
+
+def render_plan_item(item, threads=None):
+    """Encode one plan item -> clip dict, or None on failure"""
+    if rendered_output(item):
+        print(f"♻️  Reusing rendered short: {os.path.basename(item['output_path'])}")
+        return clip_info(item)
+    source_path, source_start = item_source(item)
+    if not source_path:
+        return None
+    os.makedirs(os.path.dirname(item['output_path']), exist_ok=True)
+    success = create_blurred_background_short(source_path, item['output_path'], source_start,
+                                              item['duration'], threads=threads, profile=item.get('profile'))
+    return clip_info(item) if success else None
+
+# ==================== RENDER QUEUE ====================
+# Plan items not used by a slot wait here for later slots
+RENDER_QUEUE_FILE = "render_queue.json"
+RENDER_QUEUE_MAX_AGE_DAYS = 3
+
+def load_render_queue():
+    if os.path.exists(RENDER_QUEUE_FILE):
+        try:
+            with open(RENDER_QUEUE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return []
+
+def save_render_queue(items):
+    write_json_atomic(RENDER_QUEUE_FILE, items)
+
+def queue_plan_items(items):
+    """Append unused plan items (best first) for later slots"""
+    if items:
+        save_render_queue(load_render_queue() + list(items))
+        print(f"🗂️  Queued {len(items)} unrendered clips in {RENDER_QUEUE_FILE}")
+
+def requeue_plan_item(item):
+    """
+    Put an item back at the front of the queue (its upload failed).
+    It is marked rendered, so the next slot uploads the existing short.
+    """
+    save_render_queue([dict(item, rendered=True)] + load_render_queue())
+    print(f"🗂️  Put clip t={int(item['start'])}s back in {RENDER_QUEUE_FILE}")
+
+def pop_render_queue():
+    """
+    Next still-usable queued item (removed from the queue), or None.
+    Items expire after RENDER_QUEUE_MAX_AGE_DAYS or when both their
+    downloaded source and any rendered short are gone.
+    """
+    queue = load_render_queue()
+    cutoff = datetime.now() - timedelta(days=RENDER_QUEUE_MAX_AGE_DAYS)
+    item = None
+    while queue and item is None:
+        candidate = queue.pop(0)
+        fresh = datetime.fromisoformat(candidate.get('planned_at', '1970-01-01')) >= cutoff
+        usable = (rendered_output(candidate) or candidate.get('two_phase')
+                  or os.path.exists(candidate['video_path']))
+        if fresh and usable:
+            item = candidate
+    save_render_queue(queue)
+    return item
+
+def process_video(url, num_clips=5, clip_duration=45, lazy=False):
+    """
+    Main processing pipeline.
+    lazy=True returns the render plan (see plan_video) without encoding;
+    otherwise every short is rendered and the list of clips returned.
+    """
+    plan = plan_video(url, num_clips, clip_duration)
+    if lazy or plan is None:
+        return plan if lazy else []
     
-    for i, moment in enumerate(moments):
-        short_filename = f"short_{i+1}_t{int(moment['start'])}s.mp4"
-        short_path = os.path.join(output_folder, short_filename)
-        
-        success = create_blurred_background_short(
-            video_path,
-            short_path,
-            moment['start'],
-            moment['duration']
-        )
+    items = plan['items']
+    video_id = plan['video_id']
+    output_folder = plan['output_folder']
+    
+    # Step 4: Generate shorts with blurred background
+    if RENDER_STRATEGY == "batch":
+        # One ffmpeg: every source range decoded once, all shorts written together
+        prepared = [(item, item_source(item)) for item in items]
+        prepared = [(item, source) for item, source in prepared if source[0]]
+        jobs = [(path, start, item['duration']) for item, (path, start) in prepared]
+        done = render_shorts_batch(jobs, [item['output_path'] for item, _ in prepared],
+                                   threads=os.cpu_count()) if prepared else []
+        generated_shorts = [clip_info(item) for (item, _), ok in zip(prepared, done) if ok]
+    else:
+        # Several ffmpegs at once
+        workers, threads = plan_render_workers(len(items))
+        print(f"⚙️  Rendering {len(items)} shorts: {workers} in parallel x {threads} ffmpeg threads")
         
-        if success:
-            generated_shorts.append({
-                "path": short_path,
-                "start_time": moment['start'],
-                "duration": moment['duration'],
-                "viral_score": moment['score']
-            })
+        # map() keeps moment order whatever finishes first
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda item: render_plan_item(item, threads), items))
+        generated_shorts = [r for r in results if r]
     
     # Step 5: Save metadata
     metadata = {
@@ -282,8 +606,7 @@ def process_video(url, num_clips=5, clip_duration=45):
     }
     
     metadata_path = os.path.join(output_folder, "metadata.json")
-    with open(metadata_path, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    write_json_atomic(metadata_path, metadata)
     
     # Summary
     print("\n" + "=" * 60)
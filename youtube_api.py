@@ -0,0 +1,275 @@
+"""
+YouTube Data API Quota Manager
+Every call goes through YouTubeClient, which charges it against a daily
+ledger persisted in quota_ledger.json (the quota resets at midnight Pacific).
+The planner picks the cheapest way to scan each channel - playlistItems.list
+on the uploads playlist costs 1 unit, search.list costs 100 - and trims the
+plan to what the remaining budget can pay for, so a run degrades instead of
+dying on quotaExceeded halfway through.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: the ledger is only locked within one process
+    fcntl = None
+
+QUOTA_LEDGER_FILE = "quota_ledger.json"
+DAILY_QUOTA = int(os.environ.get("YOUTUBE_DAILY_QUOTA", 10000))
+
+# Units per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+ENDPOINT_COSTS = {
+    "search.list": 100,
+    "videos.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.insert": 1600,
+    "videos.update": 50,
+    "thumbnails.set": 50,
+}
+UPLOAD_COST = ENDPOINT_COSTS["videos.insert"]
+
+# Requests in flight to googleapis.com at once, across all threads
+API_CONCURRENCY = int(os.environ.get("YOUTUBE_API_CONCURRENCY", 6))
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+_host_slots = threading.BoundedSemaphore(API_CONCURRENCY)
+VIDEOS_BATCH_SIZE = 50  # videos.list accepts up to 50 comma-separated IDs
+
+class QuotaExhausted(Exception):
+    """Raised instead of making a call the remaining budget cannot pay for"""
+
+def is_quota_error(error):
+    return 'quotaExceeded' in str(error) or 'dailyLimitExceeded' in str(error)
+
+def _status(error):
+    return getattr(getattr(error, 'resp', None), 'status', None)
+
+def is_rate_limited(error):
+    """Short-term throttling worth retrying - unlike quotaExceeded, it clears in seconds"""
+    status, reason = _status(error), str(error)
+    return status == 429 or (status == 403 and ('rateLimitExceeded' in reason or 'RateLimitExceeded' in reason))
+
+def quota_day():
+    """Date the quota is counted against (it resets at midnight Pacific time)"""
+    try:
+        from zoneinfo import ZoneInfo
+        now = datetime.now(ZoneInfo("America/Los_Angeles"))
+    except Exception:
+        now = datetime.now(timezone(timedelta(hours=-8)))
+    return now.strftime("%Y-%m-%d")
+
+class QuotaLedger:
+    """
+    Units spent today, shared by every process through the ledger file.
+    Each read-modify-write holds an exclusive flock on <ledger>.lock, so the
+    scheduler and a manual run can't lose each other's spends (POSIX only).
+    """
+
+    def __init__(self, path=QUOTA_LEDGER_FILE, daily_quota=DAILY_QUOTA):
+        self.path = path
+        self.daily_quota = daily_quota
+        self._lock = threading.Lock()
+
+    def _load(self):
+        today = quota_day()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                if data.get('date') == today:
+                    return data
+            except (OSError, ValueError):
+                pass
+        return {'date': today, 'used': 0, 'calls': {}}
+
+    @contextmanager
+    def _locked(self):
+        """Thread lock, plus a file lock for other processes where flock exists"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            # A separate lock file: _save() replaces the ledger file itself
+            with open(self.path + ".lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save(self, data):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def used(self):
+        with self._locked():
+            return self._load()['used']
+
+    def remaining(self):
+        return max(0, self.daily_quota - self.used())
+
+    def can_afford(self, units):
+        return self.remaining() >= units
+
+    def spend(self, endpoint, units=None):
+        """Record one call of `endpoint` (failed calls are charged too)"""
+        units = ENDPOINT_COSTS.get(endpoint, 1) if units is None else units
+        with self._locked():
+            data = self._load()
+            data['used'] += units
+            data['calls'][endpoint] = data['calls'].get(endpoint, 0) + 1
+            self._save(data)
+
+    def mark_exhausted(self):
+        """The API said quotaExceeded - trust it over our own count until the reset"""
+        with self._locked():
+            data = self._load()
+            data['used'] = max(data['used'], self.daily_quota)
+            self._save(data)
+
+    def summary(self):
+        with self._locked():
+            data = self._load()
+        return f"{data['used']:,}/{self.daily_quota:,} units used today ({data['date']} PT)"
+
+_ledger = None
+
+def get_ledger():
+    global _ledger
+    if _ledger is None:
+        _ledger = QuotaLedger()
+    return _ledger
+
+def remaining_budget():
+    """Units left today - what the scheduler checks before starting a slot"""
+    return get_ledger().remaining()
+
+def can_start_slot(units):
+    """True when today's budget still covers a slot estimated at `units`"""
+    return remaining_budget() >= units
+
+class YouTubeClient:
+    """
+    Thin wrapper over a googleapiclient service:
+        client.call("search.list", part="snippet", q=...)
+    Checks the budget first, charges the ledger, and turns quotaExceeded
+    into QuotaExhausted so callers can stop cleanly.
+    With etag=..., the request is conditional (If-None-Match) and returns
+    None when the server answers 304 Not Modified.
+
+    Safe to share between threads when built with factory=...: each thread
+    then gets its own service object (httplib2 connections are not
+    thread-safe), at most API_CONCURRENCY requests are in flight, 403/429
+    rate limits are retried with backoff, and the first quotaExceeded
+    stops every later call at once.
+    """
+
+    def __init__(self, service=None, ledger=None, factory=None):
+        self.service = service
+        self.factory = factory
+        self.ledger = ledger or get_ledger()
+        self.calls = {}
+        self.not_modified = 0
+        self.stopped = threading.Event()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _service(self):
+        if self.service is not None:
+            return self.service
+        if not hasattr(self._local, 'service'):
+            self._local.service = self.factory()
+        return self._local.service
+
+    def _count(self, endpoint, not_modified=False):
+        with self._lock:
+            if not_modified:
+                self.not_modified += 1
+            else:
+                self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    def call(self, endpoint, etag=None, **params):
+        if self.stopped.is_set():
+            raise QuotaExhausted("stopped after quotaExceeded")
+        cost = ENDPOINT_COSTS.get(endpoint, 1)
+        if not self.ledger.can_afford(cost):
+            raise QuotaExhausted(f"{endpoint} needs {cost} units, {self.ledger.remaining()} left")
+
+        resource, method = endpoint.split(".")
+        for attempt in range(MAX_RETRIES + 1):
+            request = getattr(getattr(self._service(), resource)(), method)(**params)
+            if etag:
+                request.headers['If-None-Match'] = etag
+            self._count(endpoint)
+            try:
+                with _host_slots:
+                    return request.execute()
+            except Exception as e:
+                if etag and _status(e) == 304:
+                    self._count(endpoint, not_modified=True)
+                    return None
+                if is_quota_error(e):
+                    self.stopped.set()
+                    self.ledger.mark_exhausted()
+                    raise QuotaExhausted(str(e)) from e
+                if not is_rate_limited(e) or attempt == MAX_RETRIES or self.stopped.is_set():
+                    raise
+                delay = BACKOFF_SECONDS * 2 ** attempt + random.uniform(0, BACKOFF_SECONDS)
+                print(f"  ⏳ {endpoint} rate limited ({_status(e)}), retrying in {delay:.1f}s")
+            finally:
+                self.ledger.spend(endpoint, cost)
+            time.sleep(delay)
+
+    def units_spent(self):
+        return sum(ENDPOINT_COSTS.get(e, 1) * n for e, n in self.calls.items())
+
+    def usage(self):
+        parts = [f"{n} {e}" for e, n in sorted(self.calls.items())]
+        if self.not_modified:
+            parts.append(f"{self.not_modified} not modified")
+        return f"{', '.join(parts) or 'no calls'} = {self.units_spent():,} units"
+
+# ==================== PLANNER ====================
+def plan_discovery(channels, uploads=None):
+    """
+    [(channel, endpoint), ...] in channel priority order: the 1-unit uploads
+    playlist when we know it, the 100-unit search otherwise
+    """
+    uploads = uploads or {}
+    return [(channel, "playlistItems.list" if uploads.get(channel) else "search.list")
+            for channel in channels]
+
+def plan_cost(plan, per_channel=10):
+    """Units for the listing calls plus the videos.list batches they feed"""
+    listing = sum(ENDPOINT_COSTS[endpoint] for _, endpoint in plan)
+    batches = -(-len(plan) * per_channel // VIDEOS_BATCH_SIZE)
+    return listing + batches * ENDPOINT_COSTS["videos.list"]
+
+def fit_plan(plan, budget, per_channel=10):
+    """
+    The part of `plan` that fits in `budget`: cheap playlist steps are kept
+    first, then search steps in priority order while they still fit.
+    Returns (kept, dropped), both in plan order.
+    """
+    kept = [step for step in plan if step[1] != "search.list"]
+    if plan_cost(kept, per_channel) > budget:
+        while kept and plan_cost(kept, per_channel) > budget:
+            kept.pop()
+        return kept, [step for step in plan if step not in kept]
+
+    for step in plan:
+        if step[1] == "search.list" and plan_cost(kept + [step], per_channel) <= budget:
+            kept.append(step)
+    order = {step: i for i, step in enumerate(plan)}
+    kept.sort(key=order.get)
+    return kept, [step for step in plan if step not in kept]
@@ -7,11 +7,28 @@ from googleapiclient.http import MediaFileUpload
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 import random
-import re
 import time
 import schedule
 import numpy as np
 import logging
+from media_features import extract_audio_envelope, extract_visual_features
+import media_probe
+import clip_selector
+from transcript_index import TranscriptIndex, segment_words
+from keyword_matcher import VIRAL_MATCHER, SENTIMENT_MATCHER
+import transcription_worker
+from transcription_backends import DEFAULT_BACKEND
+import transcript_cache
+from chunked_transcription import transcribe_chunked, stitch
+from smart_cut import smart_cut
+from download_manager import DOWNLOAD_MODE, download_audio_proxy, download_section
+import youtube_api
+import channel_cache
+import discovery_cursors
+import metadata_store
+import sqlite3
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, CancelledError
 
 # Configure logging
 logging.basicConfig(
@@ -47,6 +64,20 @@ INDIAN_PODCAST_CHANNELS = [
 MIN_VIDEO_DURATION = 180
 MAX_VIDEO_DURATION = 7200
 CLIP_DURATION = 55
+WHISPER_MODEL = "small"  # Better accuracy than base, still CPU friendly
+WHISPER_LANGUAGE = "hi"
+TRANSCRIBE_BACKEND = DEFAULT_BACKEND  # TRANSCRIBE_BACKEND env: openai-whisper / faster-whisper / stub
+TRANSCRIBE_WORKERS = int(os.environ.get("TRANSCRIBE_WORKERS", 1))  # >1 = parallel chunked transcription
+
+# "full" = Whisper the whole source, "two_stage" = Whisper only top candidate regions
+ANALYSIS_MODE = os.environ.get("ANALYSIS_MODE", "full")
+TWO_STAGE_TOP_K = 6        # Candidate windows transcribed in two-stage mode
+TWO_STAGE_PADDING = 10     # Seconds of context around each candidate clip
+VIRAL_CLIP_CANDIDATES = 5  # Non-overlapping CLIP_DURATION windows returned by the analysis
+VIRAL_WEIGHTS = {'audio_score': 0.25, 'keyword_score': 0.30, 'sentiment_score': 0.25, 'scene_score': 0.20}
+
+# "fused" = one decode/encode for the whole clip, "multistep" = old 4-encode chain (debug)
+RENDER_PIPELINE = os.environ.get("RENDER_PIPELINE", "fused")
 UPLOAD_TIMES = ["08:00", "20:00"]
 
 # ==================== SETUP ====================
@@ -69,58 +100,78 @@ def save_upload_history(history):
 # ==================== OPUS CLIP AI: VIRAL KEYWORD DETECTOR ====================
 def detect_viral_keywords(text):
     """NLP-based viral keyword detection (Opus Clip style)"""
-    
-    # High-impact viral keywords (trained from millions of viral videos)
-    viral_keywords = {
-        'extreme_hooks': ['secret', 'shocking', 'crazy', 'insane', 'unbelievable', 
-                         'never', 'always', 'everyone', 'nobody'],
-        'emotional': ['love', 'hate', 'fear', 'angry', 'happy', 'sad', 'surprised'],
-        'questions': ['why', 'how', 'what', 'when', 'where', 'kya', 'kaise', 'kyun'],
-        'hindi_power': ['nahi', 'haan', 'sach', 'jhooth', 'dekho', 'suno', 'bolo'],
-        'emphasis': ['really', 'actually', 'literally', 'definitely', 'exactly']
-    }
-    
-    text_lower = text.lower()
-    score = 0
-    found_keywords = []
-    
-    for category, keywords in viral_keywords.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                if category == 'extreme_hooks':
-                    score += 3  # Highest weight
-                elif category == 'questions':
-                    score += 2
-                else:
-                    score += 1
-                found_keywords.append(keyword)
-    
-    return score, found_keywords
+    return VIRAL_MATCHER.score(text)
 
 # ==================== OPUS CLIP AI: SENTIMENT ANALYSIS ====================
 def analyze_sentiment(text):
     """Basic sentiment analysis for engagement prediction"""
+    return SENTIMENT_MATCHER.score(text)[0]
+
+# ==================== OPUS CLIP AI: AUDIO + VISUAL FEATURES ====================
+def analyze_media_features(video_path):
+    """
+    Cheap (no transcript) features for every 5-second window:
+    one PCM decode for audio levels, one low-res pass for scene cuts
+    """
+    # Get video duration
+    duration = media_probe.duration(video_path, default=600.0)
     
-    positive_words = ['good', 'great', 'amazing', 'awesome', 'best', 'love', 
-                     'accha', 'badiya', 'zabardast', 'kamaal']
-    negative_words = ['bad', 'terrible', 'worst', 'hate', 'wrong',
-                     'bura', 'galat', 'bekar']
-    excitement_words = ['wow', 'omg', 'wtf', 'what', 'really', 'seriously',
-                       'are bhai', 'yaar', 'abe']
+    # Divide into segments
+    num_segments = int(duration / 5)  # 5-second segments
     
-    text_lower = text.lower()
+    # Decode the soundtrack once and bucket it into 5s windows
+    audio_levels = None
+    envelope = extract_audio_envelope(video_path)
+    if envelope is not None:
+        audio_levels = envelope.window_levels(5, num_segments)
     
-    pos_count = sum(1 for word in positive_words if word in text_lower)
-    neg_count = sum(1 for word in negative_words if word in text_lower)
-    exc_count = sum(1 for word in excitement_words if word in text_lower)
+    # One low-res pass over the video for scene cuts
+    scene_counts = None
+    visual = extract_visual_features(video_path)
+    if visual is not None:
+        scene_counts = visual.scene_counts(5, num_segments)
     
-    # Excitement and controversy = viral
-    sentiment_score = (pos_count * 1.5) + (neg_count * 2) + (exc_count * 2.5)
+    return {
+        'duration': duration,
+        'num_segments': num_segments,
+        'audio_levels': audio_levels,
+        'scene_counts': scene_counts
+    }
+
+def window_audio_score(media, i):
+    """Normalized audio score (0-10) of window i"""
+    mean_volume = -30
+    max_volume = -30
+    if media['audio_levels'] is not None:
+        mean_volume = float(media['audio_levels'][0][i])
+        max_volume = float(media['audio_levels'][1][i])
     
-    return sentiment_score
+    audio_energy = (abs(mean_volume) - 10) / 5
+    audio_peaks = (abs(max_volume) - 10) / 5
+    audio_score = (audio_energy + audio_peaks) / 2
+    return max(0, min(10, audio_score))
+
+def window_scene_score(media, i):
+    """High scene changes = dynamic content (0-10)"""
+    scene_changes = 0
+    if media['scene_counts'] is not None:
+        scene_changes = int(media['scene_counts'][i])
+    return min(scene_changes * 2, 10)
+
+def is_intro_or_outro(start_time, duration):
+    """First & last 10% of the video"""
+    return start_time < duration * 0.10 or start_time > duration * 0.90
+
+def position_bonus(start_time, duration):
+    """Middle content = better (20% bonus)"""
+    if duration > 0:
+        position_ratio = start_time / duration
+        if 0.25 <= position_ratio <= 0.75:
+            return 1.2
+    return 1.0
 
 # ==================== OPUS CLIP AI: COMPLETE VIRAL DETECTION ====================
-def opus_clip_viral_analysis(video_path, transcript_data):
+def opus_clip_viral_analysis(video_path, transcript_data, media=None):
     """
     Complete Opus Clip style analysis:
     - Audio energy (volume, pitch)
@@ -128,122 +179,93 @@ def opus_clip_viral_analysis(video_path, transcript_data):
     - Sentiment analysis
     - Scene changes
     - Combined viral score
+    Returns the best non-overlapping CLIP_DURATION windows, best first.
     """
     print("🤖 Running OPUS CLIP AI Analysis...\n")
     
-    # Get video duration
-    probe = subprocess.run(
-        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-         '-of', 'default=noprint_wrappers=1:nokey=1', video_path],
-        capture_output=True, text=True
-    )
-    try:
-        duration = float(probe.stdout.strip())
-    except:
-        duration = 600.0
-    
-    # Divide into segments
-    num_segments = int(duration / 5)  # 5-second segments
+    if media is None:
+        media = analyze_media_features(video_path)
+    duration = media['duration']
+    num_segments = media['num_segments']
     segments = []
     
     print(f"📊 Analyzing {num_segments} segments for viral potential...\n")
     
+    # Transcript text for every window, scored in one batch per matcher
+    transcript_index = TranscriptIndex.of(transcript_data)
+    window_texts = [transcript_index.text(i * 5, min(i * 5 + 5, duration))
+                    for i in range(num_segments)]
+    keyword_results = VIRAL_MATCHER.score_many(window_texts)
+    sentiment_results = SENTIMENT_MATCHER.score_many(window_texts)
+    
     for i in range(num_segments):
         start_time = i * 5
         end_time = min(start_time + 5, duration)
         
-        # Skip intro/outro (first & last 10%)
-        if start_time < duration * 0.10 or start_time > duration * 0.90:
-            continue
-        
         # === 1. AUDIO ENERGY ANALYSIS ===
-        audio_cmd = [
-            'ffmpeg', '-ss', str(start_time), '-i', video_path,
-            '-t', '5', '-af', 'volumedetect', '-f', 'null', '-'
-        ]
-        
-        result = subprocess.run(audio_cmd, capture_output=True, text=True, stderr=subprocess.STDOUT)
-        
-        mean_volume = -30
-        max_volume = -30
-        for line in result.stdout.split('\n'):
-            if 'mean_volume' in line:
-                try:
-                    mean_volume = float(line.split(':')[1].strip().split()[0])
-                except:
-                    pass
-            if 'max_volume' in line:
-                try:
-                    max_volume = float(line.split(':')[1].strip().split()[0])
-                except:
-                    pass
-        
-        # Normalize audio score (0-10)
-        audio_energy = (abs(mean_volume) - 10) / 5
-        audio_peaks = (abs(max_volume) - 10) / 5
-        audio_score = (audio_energy + audio_peaks) / 2
-        audio_score = max(0, min(10, audio_score))
+        audio_score = window_audio_score(media, i)
         
         # === 2. NLP KEYWORD ANALYSIS ===
-        # Extract transcript for this segment
-        segment_text = ""
-        if transcript_data and 'segments' in transcript_data:
-            for seg in transcript_data['segments']:
-                # Handle simplified whisper segments or verbose
-                seg_start = seg.get('start', 0)
-                seg_end = seg.get('end', 0)
-                if seg_start >= start_time and seg_start < end_time:
-                    segment_text += seg.get('text', '') + " "
-        
-        keyword_score, keywords = detect_viral_keywords(segment_text)
+        segment_text = window_texts[i]
+        keyword_score, keywords = keyword_results[i]
         
         # === 3. SENTIMENT ANALYSIS ===
-        sentiment_score = analyze_sentiment(segment_text)
+        sentiment_score = sentiment_results[i][0]
         
         # === 4. SCENE CHANGE DETECTION ===
-        # High scene changes = dynamic content
-        scene_cmd = [
-            'ffmpeg', '-ss', str(start_time), '-i', video_path,
-            '-t', '5', '-vf', 'select=gt(scene\\,0.3),showinfo',
-            '-f', 'null', '-'
-        ]
-        
-        scene_result = subprocess.run(scene_cmd, capture_output=True, text=True, stderr=subprocess.STDOUT)
-        scene_changes = scene_result.stdout.count('Parsed_showinfo')
-        scene_score = min(scene_changes * 2, 10)
-        
-        # === 5. COMBINED VIRAL SCORE (Opus Clip Formula) ===
-        # Weighted combination based on ML training
-        viral_score = (
-            audio_score * 0.25 +      # Audio energy
-            keyword_score * 0.30 +    # Viral keywords (most important)
-            sentiment_score * 0.25 +  # Emotional engagement
-            scene_score * 0.20        # Visual dynamics
-        )
-        
-        # Position bonus (middle content = better)
-        if duration > 0:
-            position_ratio = start_time / duration
-            if 0.25 <= position_ratio <= 0.75:
-                viral_score *= 1.2  # 20% bonus for middle content
+        scene_score = window_scene_score(media, i)
         
         segments.append({
             'start': start_time,
             'end': end_time,
-            'viral_score': viral_score,
             'audio_score': audio_score,
             'keyword_score': keyword_score,
             'keywords': keywords,
             'sentiment_score': sentiment_score,
             'scene_score': scene_score,
-            'text': segment_text.strip()
+            'text': segment_text
         })
     
-    # Sort by viral score
-    segments.sort(key=lambda x: x['viral_score'], reverse=True)
+    if not segments:
+        return []
     
-    # Show top 5 viral moments
-    print("🔥 TOP 5 VIRAL MOMENTS (Opus Clip AI):\n")
+    # === 5. COMBINED VIRAL SCORE (Opus Clip Formula) for every clip start ===
+    # Per-second features (each 5s window's scores over its seconds), so a
+    # clip can start on any second instead of only on a window boundary
+    seconds = max(int(duration), 1)
+    window_of = np.minimum(np.arange(seconds) // 5, num_segments - 1)
+    features = {name: np.array([seg[name] for seg in segments], dtype=float)[window_of]
+                for name in VIRAL_WEIGHTS}
+    per_second = clip_selector.combine(features, VIRAL_WEIGHTS)
+    
+    # Skip intro/outro (first & last 10%), middle content = better
+    starts = range(seconds)
+    allowed = [not is_intro_or_outro(t, duration) for t in starts]
+    bonus = [position_bonus(t, duration) for t in starts]
+    clips = (clip_selector.select_clips(per_second, CLIP_DURATION, VIRAL_CLIP_CANDIDATES,
+                                        allowed=allowed, start_weights=bonus)
+             # Too short to clear the intro/outro: any start will do
+             or clip_selector.select_clips(per_second, CLIP_DURATION, VIRAL_CLIP_CANDIDATES,
+                                           start_weights=bonus))
+    
+    windows = []
+    for clip in clips:
+        inside = segments[clip['start'] // 5:(clip['end'] + 4) // 5]
+        windows.append({
+            'start': clip['start'],
+            'end': min(clip['end'], duration),
+            'viral_score': clip['score'],
+            'audio_score': float(np.mean([seg['audio_score'] for seg in inside])),
+            'keyword_score': max(seg['keyword_score'] for seg in inside),
+            'keywords': list(dict.fromkeys(k for seg in inside for k in seg['keywords'])),
+            'sentiment_score': float(np.mean([seg['sentiment_score'] for seg in inside])),
+            'scene_score': float(np.mean([seg['scene_score'] for seg in inside])),
+            'text': transcript_index.text(clip['start'], min(clip['end'], duration))
+        })
+    segments = windows
+    
+    # Show top viral moments
+    print(f"🔥 TOP {len(segments)} VIRAL MOMENTS (Opus Clip AI):\n")
     for i, seg in enumerate(segments[:5], 1):
         mins = int(seg['start'] // 60)
         secs = int(seg['start'] % 60)
@@ -258,115 +280,372 @@ def opus_clip_viral_analysis(video_path, transcript_data):
     return segments
 
 # ==================== WHISPER TRANSCRIPTION ====================
-def transcribe_video(video_path):
+def transcribe_video(video_path, use_cache=True):
     """Whisper AI transcription with word timestamps"""
     print("🎤 Transcribing with Whisper AI...")
     
+    # Same media + same settings = same transcript, skip Whisper entirely
+    cached = None
+    if use_cache:
+        try:
+            cached = transcript_cache.get(video_path, f"{TRANSCRIBE_BACKEND}:{WHISPER_MODEL}", WHISPER_LANGUAGE, True)
+        except Exception as e:
+            print(f"⚠️  Transcript cache unavailable: {e}")
+    if cached is not None:
+        print("✅ Transcript loaded from cache!\n")
+        return cached
+    
     try:
-        import whisper
-        # Use small model for better accuracy than base, but maintain speed
-        model = whisper.load_model("small")
-        # Ensure we decode in Hindi/English mixed specific way if needed, but default is mostly fine
-        result = model.transcribe(video_path, language='hi', word_timestamps=True)
+        if TRANSCRIBE_WORKERS > 1:
+            # Silence-aligned chunks across a process pool, one model per worker
+            result = transcribe_chunked(video_path, workers=TRANSCRIBE_WORKERS, backend=TRANSCRIBE_BACKEND,
+                                        model=WHISPER_MODEL, language=WHISPER_LANGUAGE, word_timestamps=True)
+        else:
+            # Warm model from the transcription worker (loaded once, not per call)
+            result = transcription_worker.transcribe(video_path, language=WHISPER_LANGUAGE, word_timestamps=True,
+                                                     model=WHISPER_MODEL, backend=TRANSCRIBE_BACKEND)
         print("✅ Transcription complete!\n")
-        return result
     except ImportError:
         print("⚠️  Whisper not installed - using basic analysis\n")
         return None
     except Exception as e:
         print(f"⚠️  Transcription failed: {e}\n")
         return None
+    
+    if use_cache:
+        try:
+            transcript_cache.put(video_path, f"{TRANSCRIBE_BACKEND}:{WHISPER_MODEL}", WHISPER_LANGUAGE, True, result)
+        except Exception as e:
+            print(f"⚠️  Could not cache transcript: {e}")
+    return result
+
+# ==================== TWO-STAGE ANALYSIS ====================
+def rank_candidate_regions(media, top_k=TWO_STAGE_TOP_K, padding=TWO_STAGE_PADDING):
+    """
+    Stage 1: rank windows by audio + scene score only (no transcript) and turn
+    the top-K into padded [start, end) regions that cover a full clip.
+    Overlapping regions are merged.
+    """
+    duration = media['duration']
+    ranked = []
+    for i in range(media['num_segments']):
+        start_time = i * 5
+        if is_intro_or_outro(start_time, duration):
+            continue
+        cheap_score = (window_audio_score(media, i) * 0.25 +
+                       window_scene_score(media, i) * 0.20)
+        ranked.append((cheap_score * position_bonus(start_time, duration), start_time))
+    
+    ranked.sort(key=lambda x: (-x[0], x[1]))
+    
+    regions = []
+    for _, start_time in sorted(ranked[:top_k], key=lambda x: x[1]):
+        region = [max(0, start_time - padding), min(duration, start_time + CLIP_DURATION + padding)]
+        if regions and region[0] <= regions[-1][1]:
+            regions[-1][1] = max(regions[-1][1], region[1])
+        else:
+            regions.append(region)
+    return [tuple(r) for r in regions]
+
+def transcribe_regions(video_path, regions, use_cache=True):
+    """
+    Stage 2: Whisper only the candidate regions and stitch them into one
+    transcript with timestamps remapped to source time
+    """
+    parts = []
+    for n, (start, end) in enumerate(regions):
+        region_audio = os.path.join(TEMP_FOLDER, f"region_{n}.wav")
+        subprocess.run(['ffmpeg', '-ss', str(start), '-i', video_path, '-t', str(end - start),
+                        '-vn', '-ac', '1', '-ar', '16000', '-y', region_audio],
+                       check=True, capture_output=True)
+        
+        print(f"  🎯 Region {n+1}/{len(regions)}: {int(start//60)}:{int(start%60):02d} - {int(end//60)}:{int(end%60):02d}")
+        parts.append((start, transcribe_video(region_audio, use_cache=use_cache)))
+        if os.path.exists(region_audio): os.remove(region_audio)
+    
+    transcript = stitch(parts)
+    return transcript if transcript['segments'] else None
+
+def two_stage_viral_analysis(video_path, use_cache=True):
+    """Cheap features pick candidate regions, Whisper runs only on those"""
+    print("⚡ Two-stage analysis: ranking windows by audio + visuals first...\n")
+    media = analyze_media_features(video_path)
+    regions = rank_candidate_regions(media)
+    covered = sum(end - start for start, end in regions)
+    print(f"  📍 {len(regions)} candidate regions ({covered/60:.1f} of {media['duration']/60:.1f} min)\n")
+    
+    transcript = transcribe_regions(video_path, regions, use_cache=use_cache)
+    return transcript, opus_clip_viral_analysis(video_path, transcript, media)
+
+def compare_analysis_modes(video_path, top_n=5):
+    """
+    Report: run full-transcription and two-stage analysis on the same file
+    (transcript cache bypassed) and compare their picks and runtime
+    """
+    t0 = time.time()
+    full_transcript = transcribe_video(video_path, use_cache=False)
+    full_segments = opus_clip_viral_analysis(video_path, full_transcript)
+    full_time = time.time() - t0
+    
+    t0 = time.time()
+    _, fast_segments = two_stage_viral_analysis(video_path, use_cache=False)
+    fast_time = time.time() - t0
+    
+    full_picks = [seg['start'] for seg in full_segments[:top_n]]
+    fast_picks = [seg['start'] for seg in fast_segments[:top_n]]
+    # A pick "matches" if it lands inside a clip cut from one of the full picks
+    matched = sum(1 for p in fast_picks if any(abs(p - f) < CLIP_DURATION for f in full_picks))
+    
+    print("="*60)
+    print("📊 ANALYSIS MODE REPORT")
+    print("="*60)
+    print(f"Full transcription: {full_time:.1f}s")
+    print(f"Two-stage:          {fast_time:.1f}s  ({full_time / max(fast_time, 0.001):.1f}x faster)")
+    print(f"\n{'#':<3}{'Full':>10}{'Two-stage':>12}")
+    for i in range(top_n):
+        f = f"{int(full_picks[i]//60)}:{int(full_picks[i]%60):02d}" if i < len(full_picks) else "-"
+        t = f"{int(fast_picks[i]//60)}:{int(fast_picks[i]%60):02d}" if i < len(fast_picks) else "-"
+        print(f"{i+1:<3}{f:>10}{t:>12}")
+    same_best = bool(full_picks and fast_picks and full_picks[0] == fast_picks[0])
+    print(f"\nSame top pick: {'✅' if same_best else '❌'} | Overlapping picks: {matched}/{len(fast_picks)}")
+    print("="*60)
+    
+    return {
+        'full_seconds': full_time,
+        'two_stage_seconds': fast_time,
+        'full_picks': full_picks,
+        'two_stage_picks': fast_picks,
+        'same_best': same_best,
+        'matched': matched
+    }
 
 # ==================== FIND TOP VIRAL VIDEO ====================
-def find_top_viral_video_from_all_channels(history=None):
+DISCOVERY_PER_CHANNEL = 10  # Newest uploads considered per channel
+DISCOVERY_WORKERS = int(os.environ.get("DISCOVERY_WORKERS", 8))  # Channels scanned concurrently
+
+def looks_like_short(snippet):
+    """Cheap pre-filter on search snippets - tagged shorts and live/upcoming streams never qualify"""
+    title = snippet.get('title', '').lower()
+    if '#shorts' in title or '#short ' in title + ' ':
+        return True
+    return snippet.get('liveBroadcastContent', 'none') != 'none'
+
+def fetch_video_details(client, video_ids):
+    """{video_id: item} for all ids, using one videos.list call per 50 IDs"""
+    details = {}
+    for i in range(0, len(video_ids), youtube_api.VIDEOS_BATCH_SIZE):
+        batch = video_ids[i:i + youtube_api.VIDEOS_BATCH_SIZE]
+        response = client.call(
+            "videos.list",
+            part="statistics,contentDetails,snippet",
+            id=",".join(batch),
+            maxResults=youtube_api.VIDEOS_BATCH_SIZE
+        )
+        for item in response.get('items', []):
+            details[item['id']] = item
+    return details
+
+def list_channel_videos(client, channel, endpoint, published_after, uploads=None, cursor=None):
+    """
+    ([(video_id, published, snippet), ...] newest first, response etag) from
+    the uploads playlist or a search, or None when the channel answered
+    304 Not Modified to the cursor's ETag
+    """
+    cursor = cursor or {}
+    etag = discovery_cursors.etag_for(cursor, endpoint)
+    if endpoint == "playlistItems.list":
+        response = client.call(
+            "playlistItems.list", etag=etag, part="snippet,contentDetails",
+            playlistId=uploads[channel], maxResults=DISCOVERY_PER_CHANNEL
+        )
+        if response is None:
+            return None
+        items = [(item['contentDetails']['videoId'], item['contentDetails'].get('videoPublishedAt', ''),
+                  item['snippet']) for item in response.get('items', [])]
+        return [item for item in items if item[1] >= published_after], response.get('etag')
+
+    # Only ask for uploads newer than the cursor
+    since = max(published_after, cursor.get('newest_published', ''))
+    response = client.call(
+        "search.list", etag=etag, part="snippet", q=channel, type="video",
+        order="date", publishedAfter=since,
+        maxResults=DISCOVERY_PER_CHANNEL, regionCode="IN"
+    )
+    if response is None:
+        return None
+    items = [(item['id']['videoId'], item.get('snippet', {}).get('publishedAt', ''), item.get('snippet', {}))
+             for item in response['items']]
+    return items, response.get('etag')
+
+def scan_channel(client, channel, endpoint, cursor, published_after, uploads=None):
+    """
+    One channel's listing (runs on a discovery thread) ->
+    (advanced cursor, new uploads or None if unchanged, pre-filtered count)
+    """
+    listing = list_channel_videos(client, channel, endpoint, published_after, uploads, cursor)
+    if listing is None:
+        new_items = []  # 304 - nothing new to parse
+        etag = None
+    else:
+        items, etag = listing
+        new_items = discovery_cursors.take_new(cursor, items)
+    
+    fresh = [(video_id, published) for video_id, published, snippet in new_items
+             if not looks_like_short(snippet)]
+    cursor = discovery_cursors.advance(cursor, new_items, fresh, endpoint, etag, published_after)
+    return cursor, (None if listing is None else len(new_items)), len(new_items) - len(fresh)
+
+def min_slot_cost(uploads=None):
+    """Cheapest useful slot: scan the top-priority channel, then upload"""
+    first = youtube_api.plan_discovery(INDIAN_PODCAST_CHANNELS[:1], uploads)
+    return youtube_api.plan_cost(first, DISCOVERY_PER_CHANNEL) + youtube_api.UPLOAD_COST
+
+def viral_rank(video):
+    """Views gained per hour (from the metadata store) first, raw views to break ties"""
+    return (video.get('views_per_hour', 0.0), video['views'])
+
+def find_top_viral_video_from_all_channels(history=None, uploads=None, reserve=youtube_api.UPLOAD_COST):
+    """
+    `uploads` maps channel -> uploads playlist ID (1-unit scans instead of
+    100-unit searches); by default it comes from the channel cache.
+    `reserve` units are left untouched for the upload.
+    """
     print("="*80)
     print("🎯 Finding TOP VIRAL video from 25 podcast channels")
     print("="*80 + "\n")
     
-    youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+    # One service object per discovery thread (httplib2 isn't thread-safe)
+    client = youtube_api.YouTubeClient(factory=lambda: build('youtube', 'v3', developerKey=YOUTUBE_API_KEY))
     published_after = (datetime.now() - timedelta(days=7)).isoformat() + 'Z'
+    uploaded = set(history.get('uploaded_videos', [])) if history else set()
     
-    all_videos = []
+    # Channel name -> uploads playlist, resolved once and cached
+    if uploads is None:
+        uploads = channel_cache.uploads_playlists(client, INDIAN_PODCAST_CHANNELS, reserve)
+        print(f"🗂️  {len(uploads)}/{len(INDIAN_PODCAST_CHANNELS)} channels resolved to uploads playlists")
     
-    for i, channel in enumerate(INDIAN_PODCAST_CHANNELS, 1):
-        print(f"📺 [{i}/25] {channel}")
+    # Only plan what today's remaining quota can pay for
+    budget = client.ledger.remaining() - reserve
+    plan, dropped = youtube_api.fit_plan(youtube_api.plan_discovery(INDIAN_PODCAST_CHANNELS, uploads),
+                                         budget, DISCOVERY_PER_CHANNEL)
+    print(f"💰 Quota: {client.ledger.summary()} - planned {youtube_api.plan_cost(plan, DISCOVERY_PER_CHANNEL)} units")
+    if dropped:
+        print(f"⚠️  Budget too low for {len(dropped)} channels, skipping: {', '.join(c for c, _ in dropped)}\n")
+    if not plan:
+        return None
+    
+    # Pass 1: list only what is new since each channel's cursor, all channels at once
+    cursors = discovery_cursors.load_cursors()
+    channel_ids = {}  # channel -> [video_id, ...] newest first, in plan order
+    skipped = 0
+    quota_hit = False
+    
+    with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as pool:
+        futures = {channel: pool.submit(scan_channel, client, channel, endpoint, cursors.get(channel, {}),
+                                        published_after, uploads)
+                   for channel, endpoint in plan}
         
-        try:
-            search = youtube.search().list(
-                part="snippet", q=channel, type="video",
-                order="date", publishedAfter=published_after,
-                maxResults=10, regionCode="IN"
-            )
+        # Collected in plan order, so the report and the winner don't depend on finish order
+        for i, (channel, endpoint) in enumerate(plan, 1):
+            print(f"📺 [{i}/{len(plan)}] {channel}")
+            try:
+                cursor, new_count, filtered = futures[channel].result()
+            
+            # Out of quota: rank what we already have instead of failing the run
+            except youtube_api.QuotaExhausted as e:
+                if not quota_hit:
+                    quota_hit = True
+                    print(f"⚠️  Quota exhausted, stopping scan early: {e}\n")
+                    logging.warning(f"Discovery stopped early: {e}")
+                    for future in futures.values():
+                        future.cancel()
+                continue
+            except CancelledError:
+                continue
+            except Exception as e:
+                print(f"  ❌ {e}\n")
+                continue
             
-            response = search.execute()
-            channel_videos = []
+            cursors[channel] = cursor
+            skipped += filtered
+            ids = [video_id for video_id, _ in cursor['recent'] if video_id not in uploaded]
+            channel_ids[channel] = ids
+            status = "unchanged" if new_count is None else f"{new_count} new"
+            print(f"  🔎 {len(ids)} candidates ({status})\n")
+    
+    discovery_cursors.save_cursors(cursors)
+    
+    # Pass 2: resolve every candidate in batches of 50
+    unique_ids = list(dict.fromkeys(v for ids in channel_ids.values() for v in ids))
+    try:
+        details = fetch_video_details(client, unique_ids)
+    except youtube_api.QuotaExhausted as e:
+        print(f"❌ No quota left for video details: {e}")
+        logging.warning(f"Discovery could not fetch details: {e}")
+        return None
+    
+    # Every fetched batch goes into the metadata store (views snapshot), and
+    # candidates are ranked by the views/hour it computes across runs
+    channel_of = {video_id: channel for channel, ids in channel_ids.items() for video_id in ids}
+    velocity = {}
+    try:
+        with closing(metadata_store.connect()) as store:
+            metadata_store.upsert_videos(store, [metadata_store.video_from_api(item, channel_of.get(video_id))
+                                                 for video_id, item in details.items()])
+            velocity = metadata_store.velocity_by_id(store, details, published_after)
+    except sqlite3.Error as e:
+        print(f"⚠️  Metadata store unavailable, ranking by views: {e}")
+    
+    print(f"📊 API usage: {client.usage()} "
+          f"({len(unique_ids)} looked up, {skipped} pre-filtered)\n")
+    
+    all_videos = []
+    for channel, ids in channel_ids.items():
+        channel_videos = []
+        for video_id in ids:
+            item = details.get(video_id)
+            if not item:
+                continue
+            stats = item['statistics']
+            content = item['contentDetails']
+            snippet = item['snippet']
             
-            for item in response['items']:
-                video_id = item['id']['videoId']
-                
-                if history and video_id in history.get('uploaded_videos', []):
-                    continue
-                
-                details = youtube.videos().list(
-                    part="statistics,contentDetails,snippet",
-                    id=video_id
-                ).execute()
-                
-                if details['items']:
-                    stats = details['items'][0]['statistics']
-                    content = details['items'][0]['contentDetails']
-                    snippet = details['items'][0]['snippet']
-                    
-                    dur = parse_duration(content['duration'])
-                    views = int(stats.get('viewCount', 0))
-                    
-                    if dur >= MIN_VIDEO_DURATION and dur <= MAX_VIDEO_DURATION:
-                        channel_videos.append({
-                            'video_id': video_id,
-                            'title': snippet['title'],
-                            'channel': channel,
-                            'views': views,
-                            'likes': int(stats.get('likeCount', 0)),
-                            'duration': dur,
-                            'url': f"https://www.youtube.com/watch?v={video_id}"
-                        })
+            dur = metadata_store.parse_iso_duration(content['duration'])
+            views = int(stats.get('viewCount', 0))
             
-            if channel_videos:
-                top = max(channel_videos, key=lambda x: x['views'])
-                all_videos.append(top)
-                print(f"  ✅ {top['title'][:50]}... ({top['views']:,} views)\n")
-            else:
-                print(f"  ⚠️  No videos\n")
+            if dur >= MIN_VIDEO_DURATION and dur <= MAX_VIDEO_DURATION:
+                channel_videos.append({
+                    'video_id': video_id,
+                    'title': snippet['title'],
+                    'channel': channel,
+                    'views': views,
+                    'likes': int(stats.get('likeCount', 0)),
+                    'views_per_hour': velocity.get(video_id) or 0.0,  # NULL when publish time is unknown
+                    'duration': dur,
+                    'url': f"https://www.youtube.com/watch?v={video_id}"
+                })
         
-        # Handle Quota Correctly
-        except Exception as e:
-            if 'quotaExceeded' in str(e):
-                 print("❌ Quota Exceeded! Exiting...")
-                 raise e
-            print(f"  ❌ {e}\n")
+        if channel_videos:
+            top = max(channel_videos, key=viral_rank)
+            all_videos.append(top)
+            print(f"  ✅ {channel}: {top['title'][:50]}... ({top['views']:,} views, {top['views_per_hour']:,.0f}/h)")
+        else:
+            print(f"  ⚠️  {channel}: No videos")
     
     if not all_videos:
         return None
     
-    sorted_videos = sorted(all_videos, key=lambda x: x['views'], reverse=True)
+    sorted_videos = sorted(all_videos, key=viral_rank, reverse=True)
     
     print("\n🏆 TOP 5 VIRAL VIDEOS:\n")
     for i, v in enumerate(sorted_videos[:5], 1):
-        print(f"{i}. {v['channel']}: {v['title'][:50]}... ({v['views']:,} views)")
+        print(f"{i}. {v['channel']}: {v['title'][:50]}... ({v['views_per_hour']:,.0f} views/h, {v['views']:,} views)")
     
     winner = sorted_videos[0]
-    print(f"\n🔥 WINNER: {winner['channel']} - {winner['views']:,} views\n")
+    print(f"\n🔥 WINNER: {winner['channel']} - {winner['views_per_hour']:,.0f} views/h, {winner['views']:,} views\n")
     
     return winner
 
-def parse_duration(duration_str):
-    pattern = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
-    match = pattern.match(duration_str)
-    if not match:
-        return 0
-    date_parts = [int(g or 0) for g in match.groups()]
-    return date_parts[0] * 3600 + date_parts[1] * 60 + date_parts[2]
-
 # ==================== DOWNLOAD ====================
 def download_video(url, path):
     print("⬇️  Downloading...")
@@ -388,8 +667,8 @@ def download_video(url, path):
              return False
 
 # ==================== OPUS CLIP STYLE CAPTIONS ====================
-def create_opus_clip_captions(transcript, output_path):
-    """Exact Opus Clip caption style"""
+def create_opus_clip_captions(transcript, output_path, start=None, end=None):
+    """Exact Opus Clip caption style (only [start, end) of the source, shifted to clip time)"""
     
     ass_header = """[Script Info]
 ScriptType: v4.00+
@@ -404,46 +683,38 @@ Style: Default,Arial,70,&H00FFFFFF,&H000000FF,&H00000000,&HBF000000,-1,0,0,0,100
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
 """
     
+    start = start or 0
+    end = end if end is not None else float('inf')
+    segments = TranscriptIndex.of(transcript).segments_overlapping(start, end)
+    
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(ass_header)
         
-        if transcript and 'segments' in transcript:
-            for segment in transcript['segments']:
-                if 'words' in segment:
-                     words = segment['words']
-                else:
-                     # fallback
-                     w_text = segment['text'].strip()
-                     words = [{'word': w, 'start': segment['start'], 'end': segment['end']} for w in w_text.split()]
-
-                chunk_size = 2 # Tight captions
-                
-                # We need to process words
-                word_list = []
-                for w in words:
-                    # Whisper sometimes gives dict, sometimes objects depending on version? 
-                    # Assuming dict as per standard output
-                    word_list.append(w)
-
-                for i in range(0, len(word_list), chunk_size):
-                    chunk = word_list[i:i+chunk_size]
-                    if not chunk: continue
-                    
-                    text_str = ' '.join([c['word'].strip().upper() for c in chunk])
-                    start = chunk[0]['start']
-                    end = chunk[-1]['end']
-                    
-                    # Detect emphasis words
-                    _, keywords = detect_viral_keywords(text_str)
-                    
-                    if keywords:
-                        # Yellow for viral keywords
-                        styled = f"{{\\c&H00FFFF&}}{{\\fs85}}{text_str}"
-                    else:
-                        # White default
-                        styled = f"{{\\c&HFFFFFF&}}{text_str}"
-                    
-                    f.write(f"Dialogue: 0,{format_time(start)},{format_time(end)},Default,,0,0,0,,{styled}\n")
+        # Two-word chunks, never crossing a segment boundary
+        chunks = []
+        for segment in segments:
+            word_list = [w for w in segment_words(segment) if start <= w['start'] < end]
+            chunk_size = 2 # Tight captions
+            for i in range(0, len(word_list), chunk_size):
+                chunks.append(word_list[i:i+chunk_size])
+        
+        texts = [' '.join([c['word'].strip().upper() for c in chunk]) for chunk in chunks]
+        
+        # Detect emphasis words for every chunk in one pass
+        emphasis = VIRAL_MATCHER.score_many(texts)
+        
+        for chunk, text_str, (_, keywords) in zip(chunks, texts, emphasis):
+            chunk_start = max(0, chunk[0]['start'] - start)
+            chunk_end = max(0, chunk[-1]['end'] - start)
+            
+            if keywords:
+                # Yellow for viral keywords
+                styled = f"{{\\c&H00FFFF&}}{{\\fs85}}{text_str}"
+            else:
+                # White default
+                styled = f"{{\\c&HFFFFFF&}}{text_str}"
+            
+            f.write(f"Dialogue: 0,{format_time(chunk_start)},{format_time(chunk_end)},Default,,0,0,0,,{styled}\n")
 
 def format_time(s):
     h = int(s // 3600)
@@ -453,77 +724,81 @@ def format_time(s):
     return f"{h}:{m:02d}:{sec:02d}.{cs:02d}"
 
 # ==================== PROCESSING ====================
+AUTO_FRAME_FILTER = 'crop=ih*9/16:ih:iw/2-ih*9/32:0,scale=1080:1920'
+CENTER_CROP_FILTER = 'crop=ih*(9/16):ih:(iw-ow)/2:0,scale=1080:1920'
+COLOR_GRADE_FILTER = 'eq=contrast=1.1:brightness=0.05:saturation=1.2,unsharp=3:3:1.0'
+
+def captions_filter(ass_path):
+    # Fix path for ffmpeg
+    ass_path_fixed = ass_path.replace('\\', '/')
+    return f"ass='{ass_path_fixed}'"
+
+def credits_filter():
+    # Font path handling
+    font_path = "arial.ttf"
+    if os.path.exists("temp/arial.ttf"):
+        font_path = "temp/arial.ttf"
+    elif os.path.exists("C:/Windows/Fonts/arial.ttf"):
+        font_path = "C:/Windows/Fonts/arial.ttf"
+
+    font_path = font_path.replace("\\", "/")
+
+    return (f"drawtext=text='{YOUR_CHANNEL_NAME}':fontfile='{font_path}':fontsize=40:"
+            f"fontcolor=white:borderw=2:bordercolor=black:x=(w-text_w)/2:y=h-100,"
+            f"drawtext=text='{CREDITS_TEXT}':fontfile='{font_path}':fontsize=30:"
+            f"fontcolor=yellow:borderw=2:bordercolor=black:x=(w-text_w)/2:y=h-60")
+
 def auto_frame(inp, out):
     print("  🖼️ Auto-framing...")
     # Increased timeout from 60 to 300 based on previous experience
     try:
-        subprocess.run(['ffmpeg', '-i', inp, '-vf',
-                       'crop=ih*9/16:ih:iw/2-ih*9/32:0,scale=1080:1920',
+        subprocess.run(['ffmpeg', '-i', inp, '-vf', AUTO_FRAME_FILTER,
                        '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
                        '-c:a', 'copy', '-y', out],
                       check=True, capture_output=True, timeout=300)
     except:
          # Fallback to center crop
          print("  ⚠️ Smart crop failed, using center crop...")
-         subprocess.run(['ffmpeg', '-i', inp, '-vf',
-                       'crop=ih*(9/16):ih:(iw-ow)/2:0,scale=1080:1920',
+         subprocess.run(['ffmpeg', '-i', inp, '-vf', CENTER_CROP_FILTER,
                        '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
                        '-c:a', 'copy', '-y', out],
                       check=True, capture_output=True, timeout=300)
 
 def color_grade(inp, out):
     print("  🎨 Color grading...")
-    subprocess.run(['ffmpeg', '-i', inp, '-vf',
-                   'eq=contrast=1.1:brightness=0.05:saturation=1.2,unsharp=3:3:1.0',
+    subprocess.run(['ffmpeg', '-i', inp, '-vf', COLOR_GRADE_FILTER,
                    '-c:v', 'libx264', '-preset', 'medium', '-crf', '20',
                    '-c:a', 'copy', '-y', out],
                   check=True, capture_output=True, timeout=300)
 
 def add_credits(inp, out):
     print("  🏷️ Adding credits...")
-    
-    # Font path handling
-    font_path = "arial.ttf"
-    if os.path.exists("temp/arial.ttf"):
-        font_path = "temp/arial.ttf"
-    elif os.path.exists("C:/Windows/Fonts/arial.ttf"):
-        font_path = "C:/Windows/Fonts/arial.ttf"
-
-    font_path = font_path.replace("\\", "/")
-
-    subprocess.run(['ffmpeg', '-i', inp, '-vf',
-                   f"drawtext=text='{YOUR_CHANNEL_NAME}':fontfile='{font_path}':fontsize=40:"
-                   f"fontcolor=white:borderw=2:bordercolor=black:x=(w-text_w)/2:y=h-100,"
-                   f"drawtext=text='{CREDITS_TEXT}':fontfile='{font_path}':fontsize=30:"
-                   f"fontcolor=yellow:borderw=2:bordercolor=black:x=(w-text_w)/2:y=h-60",
+    subprocess.run(['ffmpeg', '-i', inp, '-vf', credits_filter(),
                    '-c:a', 'copy', '-y', out],
                   check=True, capture_output=True, timeout=120)
 
-def process_viral_clip(video_path, video_info):
-    print("\n🎬 Processing with Opus Clip AI pipeline...\n")
-    
-    # Transcribe first
-    transcript = transcribe_video(video_path)
-    
-    # Opus Clip AI analysis
-    viral_segments = opus_clip_viral_analysis(video_path, transcript)
-    
-    if not viral_segments:
-        print("❌ No viral moments found")
-        return None
-    
-    # Use top viral moment
-    best = viral_segments[0]
-    start = best['start']
-    
-    print(f"✂️  Extracting TOP viral clip from {int(start//60)}:{int(start%60):02d}")
-    print(f"    Score: {best['viral_score']:.2f}\n")
+def render_fused(video_path, start, ass_path, out):
+    """
+    ONE decode + ONE encode: crop/scale, color grade, captions and credits
+    in a single filtergraph (no intermediate files, no generation loss)
+    """
+    print("  ⚡ Rendering (single pass: frame + grade + captions + credits)...")
+    filters = [AUTO_FRAME_FILTER, COLOR_GRADE_FILTER]
+    if ass_path:
+        filters.append(captions_filter(ass_path))
+    filters.append(credits_filter())
     
-    # Extract
-    temp1 = os.path.join(TEMP_FOLDER, "step1.mp4")
     subprocess.run(['ffmpeg', '-ss', str(start), '-i', video_path,
-                   '-t', str(CLIP_DURATION), '-c', 'copy', '-y', temp1],
-                  check=True, capture_output=True)
+                   '-t', str(CLIP_DURATION), '-vf', ','.join(filters),
+                   '-c:v', 'libx264', '-preset', 'medium', '-crf', '20',
+                   '-c:a', 'aac', '-b:a', '192k', '-movflags', '+faststart', '-y', out],
+                  check=True, capture_output=True, timeout=600)
+
+def render_multistep(video_path, start, ass_path, out):
+    """Original extract -> frame -> grade -> captions -> credits chain (debug: keeps every step file)"""
+    # Extract (frame-accurate: copy whole GOPs, re-encode only the edges)
+    temp1 = os.path.join(TEMP_FOLDER, "step1.mp4")
+    smart_cut(video_path, start, CLIP_DURATION, temp1, TEMP_FOLDER)
     
     # Auto-frame
     temp2 = os.path.join(TEMP_FOLDER, "step2.mp4")
@@ -534,15 +809,10 @@ def process_viral_clip(video_path, video_info):
     color_grade(temp2, temp3)
     
     # Add captions
-    if transcript:
+    if ass_path:
         print("  📝 Burning captions...")
-        ass_path = os.path.join(TEMP_FOLDER, "captions.ass")
-        create_opus_clip_captions(transcript, ass_path)
-        
         temp4 = os.path.join(TEMP_FOLDER, "step4.mp4")
-        # Fix path for ffmpeg
-        ass_path_fixed = ass_path.replace('\\', '/')
-        subprocess.run(['ffmpeg', '-i', temp3, '-vf', f"ass='{ass_path_fixed}'",
+        subprocess.run(['ffmpeg', '-i', temp3, '-vf', captions_filter(ass_path),
                        '-c:v', 'libx264', '-preset', 'medium', '-crf', '20',
                        '-c:a', 'copy', '-y', temp4],
                       check=True, capture_output=True, timeout=300)
@@ -551,16 +821,60 @@ def process_viral_clip(video_path, video_info):
         current = temp3
     
     # Add credits
+    add_credits(current, out)
+
+def process_viral_clip(video_path, video_info, fetch_section=None):
+    """
+    Analyze video_path and render the best moment.
+    fetch_section(start) -> path: two-phase mode, where video_path is only an
+    audio proxy and the video for [start, start + CLIP_DURATION) is fetched on demand.
+    """
+    print("\n🎬 Processing with Opus Clip AI pipeline...\n")
+    
+    if ANALYSIS_MODE == "two_stage":
+        # Audio/visual ranking first, Whisper only on the candidates
+        transcript, viral_segments = two_stage_viral_analysis(video_path)
+    else:
+        # Transcribe first
+        transcript = transcribe_video(video_path)
+        
+        # Opus Clip AI analysis
+        viral_segments = opus_clip_viral_analysis(video_path, transcript)
+    
+    if not viral_segments:
+        print("❌ No viral moments found")
+        return None
+    
+    # Use top viral moment
+    best = viral_segments[0]
+    start = best['start']
+    
+    print(f"✂️  Extracting TOP viral clip from {int(start//60)}:{int(start%60):02d}")
+    print(f"    Score: {best['viral_score']:.2f}\n")
+    
+    # Captions in clip time
+    ass_path = None
+    if transcript:
+        ass_path = os.path.join(TEMP_FOLDER, "captions.ass")
+        create_opus_clip_captions(transcript, ass_path, start, start + CLIP_DURATION)
+    
     final = os.path.join(CLIPS_FOLDER, f"final_{video_info['video_id']}.mp4")
-    add_credits(current, final)
     
-    # Cleanup
-    try:
-        for t in [temp1, temp2, temp3, temp4]:
-            if os.path.exists(t):
-                # os.remove(t) # Keep temps for debugging if needed, or uncomment to clean
-                pass 
-    except: pass
+    # Two-phase: render from the downloaded section, which starts at the clip start
+    render_source, render_start = video_path, start
+    if fetch_section:
+        render_source, render_start = fetch_section(start), 0
+        if not render_source:
+            return None
+    
+    if RENDER_PIPELINE == "multistep":
+        render_multistep(render_source, render_start, ass_path, final)
+    else:
+        try:
+            render_fused(render_source, render_start, ass_path, final)
+        except Exception as e:
+            print(f"  ⚠️ Single-pass render failed ({e}), falling back to multi-step...")
+            render_multistep(render_source, render_start, ass_path, final)
     
     print(f"✅ Viral clip ready: {final}\n")
     return {'path': final, 'viral_score': best['viral_score']}
@@ -631,6 +945,7 @@ Full: {url}
         if status:
             print(f"⬆️  {int(status.progress() * 100)}%")
     
+    youtube_api.get_ledger().spend("videos.insert")
     print(f"✅ https://youtube.com/shorts/{response['id']}\n")
     return response['id']
 
@@ -643,27 +958,48 @@ def run_daily_upload():
         
         history = load_upload_history()
         
+        # Don't start a slot whose upload today's quota can no longer pay for
+        slot_cost = min_slot_cost()
+        if not youtube_api.can_start_slot(slot_cost):
+            print(f"⏸️  Skipping slot - {youtube_api.get_ledger().summary()}, need at least {slot_cost}")
+            logging.warning("Slot skipped: not enough YouTube API quota left")
+            return
+        
         winner = find_top_viral_video_from_all_channels(history)
         if not winner:
             print("❌ No suitable video found")
             return
         
-        video_path = os.path.join(DOWNLOAD_FOLDER, f"{winner['video_id']}.mp4")
-        
-        if not download_video(winner['url'], video_path):
-            return
+        sections = []   # Clip ranges fetched in two-phase mode, removed with the source
+        if DOWNLOAD_MODE == "two_phase":
+            # Audio-only proxy for analysis, then just the chosen clip range of the video
+            video_path = download_audio_proxy(winner['url'], os.path.join(DOWNLOAD_FOLDER, f"{winner['video_id']}_audio"))
+            if not video_path:
+                return
+            def fetch_section(start):
+                # Named by start: a section on disk from an earlier run is only reused for the same moment
+                path = os.path.join(DOWNLOAD_FOLDER, f"{winner['video_id']}_{int(start)}s.mp4")
+                sections.append(path)
+                return download_section(winner['url'], start, start + CLIP_DURATION, path)
+        else:
+            video_path = os.path.join(DOWNLOAD_FOLDER, f"{winner['video_id']}.mp4")
+            if not download_video(winner['url'], video_path):
+                return
+            fetch_section = None
         
-        clip = process_viral_clip(video_path, winner)
+        clip = process_viral_clip(video_path, winner, fetch_section)
         
         if not clip:
-            if os.path.exists(video_path): os.remove(video_path)
+            for p in [video_path] + sections:
+                if p and os.path.exists(p): os.remove(p)
             return
         
         youtube = get_authenticated_service()
         upload_short(youtube, clip['path'], winner['title'],
                     winner['views'], winner['channel'], winner['url'])
         
-        if os.path.exists(video_path): os.remove(video_path)
+        for p in [video_path] + sections:
+            if p and os.path.exists(p): os.remove(p)
         
         history['uploaded_videos'].append(winner['video_id'])
         history['last_upload_time'] = datetime.now().isoformat()
@@ -708,6 +1044,8 @@ def main():
     
     if mode == "1":
         print("\n✅ Scheduled!\n")
+        # Warm Whisper worker for the slots (and any other local process)
+        transcription_worker.start_background_worker(WHISPER_MODEL, TRANSCRIBE_BACKEND)
         schedule.every().day.at("08:00").do(run_daily_upload)
         schedule.every().day.at("20:00").do(run_daily_upload)
         while True: